@@ -3,10 +3,15 @@
 import io
 import os
 import json
+import base58
 import struct
+import functools
+import threading
 
 from typing import TextIO, Union
 from enum import IntEnum
+from collections import OrderedDict
+from mainsail import codec
 
 XTOSHI = 1e8
 
@@ -36,8 +41,8 @@ class EXPIRATION_TYPES(IntEnum):
 def loadJson(path: str) -> Union[dict, list]:
     "Load JSON data from path"
     if os.path.exists(path):
-        with io.open(path, "r", encoding="utf-8") as in_:
-            data = json.load(in_)
+        with io.open(path, "rb") as in_:
+            data = codec.loads(in_.read())
     else:
         data = {}
     try:
@@ -49,15 +54,23 @@ def loadJson(path: str) -> Union[dict, list]:
 
 
 def dumpJson(data: Union[dict, list], path: str, **opt) -> None:
-    "Dump JSON data to path"
+    """
+    Dump JSON data to path. Shared codec is used unless `json.dump` options
+    other than `indent` are given. Indentation defaults to 4 spaces or to
+    none if shared codec is set compact.
+    """
     if "indent" not in opt:
-        opt["indent"] = 4
+        opt["indent"] = None if codec.CODEC.compact else 4
     try:
         os.makedirs(os.path.dirname(path))
     except Exception:
         pass
-    with io.open(path, "w", encoding="utf-8") as out:
-        json.dump(data, out, **opt)
+    if list(opt) == ["indent"]:
+        with io.open(path, "wb") as out:
+            out.write(codec.dumps(data, opt["indent"]))
+    else:
+        with io.open(path, "w", encoding="utf-8") as out:
+            json.dump(data, out, **opt)
     try:
         out.close()
         del out
@@ -65,14 +78,107 @@ def dumpJson(data: Union[dict, list], path: str, **opt) -> None:
         pass
 
 
+# precompiled struct layouts used by transaction (de)serialization
+# header: 0xff, version, network, typeGroup, type, nonce, senderPublicKey,
+# fee and vendorField length
+HEADER = struct.Struct("<BBBIHQ33sQB")
+UINT8 = struct.Struct("<B")
+UINT16 = struct.Struct("<H")
+UINT32 = struct.Struct("<I")
+UINT64 = struct.Struct("<Q")
+AMOUNT_EXPIRATION = struct.Struct("<QI")
+
+
+@functools.lru_cache(maxsize=256)
+def get_struct(fmt: str) -> struct.Struct:
+    "Return a compiled and cached `struct.Struct` for the given format"
+    return struct.Struct(fmt)
+
+
+class AddressCodec:
+    """
+    Thread-safe and size-bounded LRU cache of base58check wallet address
+    encoding and decoding. Each address computed in one direction is also
+    served in the other one, so checksum is computed only once per wallet.
+
+    Args:
+        maxsize (int): maximum number of cached addresses.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._addresses = OrderedDict()  # address -> raw bytes
+        self._raws = {}  # raw bytes -> address
+        self._lock = threading.Lock()
+
+    def _store(self, address: str, raw: bytes) -> None:
+        self._addresses[address] = raw
+        self._raws[raw] = address
+        while len(self._addresses) > self.maxsize:
+            self._raws.pop(self._addresses.popitem(last=False)[-1], None)
+
+    def decode(self, address: str) -> bytes:
+        """
+        Return raw bytes of a wallet address.
+
+        Raises:
+            ValueError: if address is not a valid base58check string.
+        """
+        with self._lock:
+            raw = self._addresses.get(address, None)
+            if raw is not None:
+                self._addresses.move_to_end(address)
+                self.hits += 1
+                return raw
+            self.misses += 1
+        raw = base58.b58decode_check(address)
+        with self._lock:
+            self._store(address, raw)
+        return raw
+
+    def encode(self, raw: bytes) -> str:
+        "Return wallet address of raw bytes."
+        raw = bytes(raw)
+        with self._lock:
+            address = self._raws.get(raw, None)
+            if address is not None:
+                self._addresses.move_to_end(address)
+                self.hits += 1
+                return address
+            self.misses += 1
+        address = base58.b58encode_check(raw).decode("utf-8")
+        with self._lock:
+            self._store(address, raw)
+        return address
+
+    def clear(self) -> None:
+        with self._lock:
+            self._addresses.clear()
+            self._raws.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._addresses), "maxsize": self.maxsize
+        }
+
+
+# shared wallet address cache
+ADDRESSES = AddressCodec()
+
+
 def unpack(fmt: str, fileobj: TextIO) -> tuple:
     "Read value as binary data from buffer"
-    return struct.unpack(fmt, fileobj.read(struct.calcsize(fmt)))
+    layout = get_struct(fmt)
+    return layout.unpack(fileobj.read(layout.size))
 
 
 def pack(fmt: str, fileobj: TextIO, values: tuple):
     "Write values as binary data into buffer"
-    return fileobj.write(struct.pack(fmt, *values))
+    return fileobj.write(get_struct(fmt).pack(*values))
 
 
 def unpack_bytes(f: TextIO, n: int) -> bytes:
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+JSON codec module. `orjson` is used if installed, standard `json` module
+otherwise. Both codecs read `str` or `bytes` and write `bytes`.
+
+```python
+>>> from mainsail import codec
+>>> codec.CODEC.name
+'orjson'
+>>> codec.loads(b'{"a": 1}')
+{'a': 1}
+>>> # write compact files with dumpJson
+>>> codec.CODEC.compact = True
+>>> # force standard library codec
+>>> codec.use_codec(codec.StdlibCodec())
+```
+"""
+
+import json
+
+from typing import Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibCodec:
+    """
+    JSON codec based on standard `json` module.
+
+    Args:
+        compact (bool): if `True`, files are written without indentation
+            nor spaces by `mainsail.dumpJson`.
+    """
+
+    name = "json"
+
+    def __init__(self, compact: bool = False) -> None:
+        self.compact = compact
+
+    def loads(self, data: Union[bytes, str]) -> Union[dict, list]:
+        "Parse JSON data."
+        return json.loads(data)
+
+    def dumps(self, data: Union[dict, list], indent: int = None) -> bytes:
+        "Serialize data as utf-8 encoded JSON, compact if no `indent`."
+        if indent:
+            return json.dumps(data, indent=indent).encode("utf-8")
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec(StdlibCodec):
+    """
+    JSON codec based on `orjson`. Indentation is always 2 spaces and data
+    `orjson` cannot serialize (integers above 64 bits for example) falls
+    back to standard `json` module.
+    """
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Union[dict, list]:
+        return orjson.loads(data)
+
+    def dumps(self, data: Union[dict, list], indent: int = None) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            return StdlibCodec.dumps(self, data, indent)
+
+
+def use_codec(codec: StdlibCodec) -> None:
+    "Replace the shared codec."
+    global CODEC
+    CODEC = codec
+
+
+def loads(data: Union[bytes, str]) -> Union[dict, list]:
+    "Parse JSON data with shared codec."
+    return CODEC.loads(data)
+
+
+def dumps(data: Union[dict, list], indent: int = None) -> bytes:
+    "Serialize data with shared codec."
+    return CODEC.dumps(data, indent)
+
+
+# shared codec
+CODEC = StdlibCodec() if orjson is None else OrjsonCodec()
@@ -3,9 +3,13 @@
 import os
 import sys
 import pickle
+import tempfile
+import threading
 
 DATA = os.path.join(os.getenv("HOME"), ".mainsail", ".networks")
 _track = []
+# snapshot updates are read-modify-write operations
+_lock = threading.RLock()
 
 
 def _clear() -> None:
@@ -15,25 +19,60 @@ def _clear() -> None:
     _track.clear()
 
 
-def _dump(name: str) -> None:
-    path = os.path.join(DATA, f"{name}.net")
+def _set(name: str, value: object) -> None:
+    setattr(sys.modules[__name__], name, value)
+    if name not in _track:
+        _track.append(name)
+
+
+def _write(path: str, data: dict) -> None:
+    # write a uniquely named temporary file first so concurrent readers
+    # never get a partially written snapshot and concurrent writers never
+    # replace each other temporary file
     os.makedirs(DATA, exist_ok=True)
-    with open(path, "wb") as output:
-        pickle.dump(
-            dict(
-                [attr, getattr(sys.modules[__name__], attr)]
-                for attr in _track
-            ), output
+    with tempfile.NamedTemporaryFile(
+        dir=DATA, suffix=".tmp", delete=False
+    ) as output:
+        pickle.dump(data, output)
+    os.replace(output.name, path)
+
+
+def _dump(name: str) -> None:
+    _write(
+        os.path.join(DATA, f"{name}.net"), dict(
+            [attr, getattr(sys.modules[__name__], attr)]
+            for attr in _track
         )
+    )
 
 
-def _load(name: str) -> bool:
+def _update(name: str, **values) -> bool:
+    path = os.path.join(DATA, f"{name}.net")
+    with _lock:
+        if os.path.exists(path):
+            with open(path, "rb") as input:
+                data = pickle.load(input)
+            data.update(values)
+            _write(path, data)
+            return True
+    return False
+
+
+def _read(name: str) -> dict:
+    # network snapshot without touching current configuration
     path = os.path.join(DATA, f"{name}.net")
     if os.path.exists(path):
-        _clear()
         with open(path, "rb") as input:
-            for attr, value in pickle.load(input).items():
-                setattr(sys.modules[__name__], attr, value)
-                _track.append(attr)
+            return pickle.load(input)
+    return {}
+
+
+def _load(name: str) -> bool:
+    data = _read(name)
+    if data:
+        _clear()
+        for attr, value in data.items():
+            setattr(sys.modules[__name__], attr, value)
+            _track.append(attr)
         return True
     return False
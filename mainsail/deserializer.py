@@ -1,61 +1,76 @@
 # -*- coding: utf-8 -*-
 
-import base58
-import binascii
-from typing import TextIO
-from mainsail import unpack, unpack_bytes
-
-
-def _1_0(cls, buf: TextIO):
-    cls.amount, cls.expiration = unpack("<QI", buf)
-    recipientId = base58.b58encode_check(unpack_bytes(buf, 21))
-    cls.recipientId = recipientId.decode("utf-8")
-
-
-def _1_2(cls, buf: TextIO):
-    cls.asset["validatorPublicKey"] = \
-        binascii.hexlify(unpack_bytes(buf, 96)).decode("utf-8")
-
-
-def _1_3(cls, buf: TextIO):
-    n, = unpack("<B", buf)
-    cls.asset["votes"] = [
-        binascii.hexlify(unpack_bytes(buf, 33)).decode("utf-8")
-        for i in range(n)
-    ]
-    n, = unpack("<B", buf)
-    cls.asset["unvotes"] = [
-        binascii.hexlify(unpack_bytes(buf, 33)).decode("utf-8")
-        for i in range(n)
-    ]
-
-
-def _1_4(cls, buf: TextIO):
-    cls.asset["multiSignature"]["min"], n = unpack("<BB", buf)
-    cls.asset["multiSignature"]["publicKeys"] = [
-        binascii.hexlify(unpack_bytes(buf, 33)).decode("utf-8")
-        for i in range(n)
-    ]
+from mainsail import UINT16, UINT64, AMOUNT_EXPIRATION, ADDRESSES
+
+# asset deserializers read from `data` memoryview starting at `offset` and
+# return the offset of the first byte following the asset
+
+
+def _1_0(cls, data: memoryview, offset: int) -> int:
+    cls.amount, cls.expiration = AMOUNT_EXPIRATION.unpack_from(data, offset)
+    offset += AMOUNT_EXPIRATION.size
+    cls.recipientId = ADDRESSES.encode(data[offset:offset + 21])
+    return offset + 21
+
+
+def _1_2(cls, data: memoryview, offset: int) -> int:
+    cls.asset = {"validatorPublicKey": data[offset:offset + 48].hex()}
+    return offset + 48
+
+
+def _1_3(cls, data: memoryview, offset: int) -> int:
+    cls.asset = {}
+    for key in ["votes", "unvotes"]:
+        n = data[offset]
+        offset += 1
+        cls.asset[key] = [
+            data[offset + 33 * i:offset + 33 * (i + 1)].hex()
+            for i in range(n)
+        ]
+        offset += 33 * n
+    return offset
+
+
+def _1_4(cls, data: memoryview, offset: int) -> int:
+    minimum, n = data[offset], data[offset + 1]
+    offset += 2
+    cls.asset = {
+        "multiSignature": {
+            "min": minimum,
+            "publicKeys": [
+                data[offset + 33 * i:offset + 33 * (i + 1)].hex()
+                for i in range(n)
+            ]
+        }
+    }
+    return offset + 33 * n
 
 
-def _1_6(cls, buf: TextIO):
-    n, = unpack("<H", buf)
+def _1_6(cls, data: memoryview, offset: int) -> int:
+    n, = UINT16.unpack_from(data, offset)
+    offset += UINT16.size
+    payments = []
     for i in range(n):
-        amount, = unpack("<Q", buf)
-        address, = base58.b58encode_check(unpack_bytes(buf, 21))
-        cls.assets["payments"][i] = {
-            "recipientId": address.decode("utf-8"), "amount": amount
-        }
+        amount, = UINT64.unpack_from(data, offset)
+        offset += UINT64.size
+        address = ADDRESSES.encode(data[offset:offset + 21])
+        offset += 21
+        payments.append({"recipientId": address, "amount": amount})
+    cls.asset = {"payments": payments}
+    cls.amount = sum(item["amount"] for item in payments)
+    return offset
 
 
-def _1_7(cls, buf: TextIO):
-    pass
+def _1_7(cls, data: memoryview, offset: int) -> int:
+    return offset
 
 
-def _1_8(cls, buf: TextIO):
-    n, = unpack("<B", buf)
-    cls.asset = {"username": unpack_bytes(buf, n).decode("utf-8")}
+def _1_8(cls, data: memoryview, offset: int) -> int:
+    n = data[offset]
+    offset += 1
+    cls.asset = {"username": str(data[offset:offset + n], "utf-8")}
+    return offset + n
 
 
-def _1_9(cls, buf: TextIO):
-    pass
+def _1_9(cls, data: memoryview, offset: int) -> int:
+    return offset
@@ -14,11 +14,14 @@ import pyaes
 import base58
 import hashlib
 import binascii
+import functools
 import cSecp256k1
 import unicodedata
+import multiprocessing
+import concurrent.futures
 
-from mainsail import config
-from typing import Union, List
+from mainsail import config, ADDRESSES
+from typing import Union, List, Iterable, Tuple
 
 DATA = os.path.join(os.getenv("HOME"), ".mainsail", ".keyrings")
 
@@ -201,8 +204,7 @@ def combine_puk(*puki) -> str:
 def get_wallet(puk: str, version: int = None) -> str:
     ripemd160 = hashlib.new('ripemd160', binascii.unhexlify(puk)).digest()[:20]
     seed = binascii.unhexlify(f"{version or config.version:02x}") + ripemd160
-    b58 = base58.b58encode_check(seed)
-    return b58.decode('utf-8') if isinstance(b58, bytes) else b58
+    return ADDRESSES.encode(seed)
 
 
 def sign(
@@ -249,6 +251,53 @@ def sign(
     )()
 
 
+def _verify(bip340: bool, triple: Tuple[str, bytes, str]) -> bool:
+    # process pool worker
+    return (Schnorr if bip340 else Bcrpt410).verify(*triple)
+
+
+def verify_batch(
+    triples: Iterable[Tuple[str, Union[str, bytes], str]],
+    processes: int = None, threshold: int = 64
+) -> List[bool]:
+    """
+    Verify many Schnorr signatures according to network specification
+    (bcrypto 4.10 or BIP 340). Large batches are verified over a process
+    pool.
+
+    ```python
+    >>> identity.verify_batch([
+    ...     (puk, "simple message", sig), (puk, "other message", sig)
+    ... ])
+    [True, False]
+    ```
+
+    Args:
+        triples (Iterable[tuple]): (public key, data, signature) triples,
+            public key and signature as hexadecimal strings.
+        processes (int): process pool size, default to cpu count.
+        threshold (int): minimum batch size to use the process pool.
+
+    Returns:
+        List[bool]: verification results, in the given order.
+    """
+    triples = list(triples)
+    worker = functools.partial(_verify, getattr(config, "bip340", False))
+    processes = processes or os.cpu_count() or 1
+    if len(triples) < threshold or processes == 1:
+        return [worker(triple) for triple in triples]
+    # workers are spawned, see `transaction.sign_batch`
+    with concurrent.futures.ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(
+            executor.map(
+                worker, triples,
+                chunksize=max(1, len(triples) // (processes * 4))
+            )
+        )
+
+
 def user_keys(secret: Union[int, str]) -> dict:
     """
     Generate keyring containing secp256k1 keys-pair and wallet import format
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Sender nonce managment module. Nonces are handed out from a local counter
+per sender public key so transaction building never blocks on network.
+
+```python
+>>> from mainsail import nonces
+>>> # offline: set the next nonce to be used by a sender
+>>> nonces.PROVIDER.set(puk, 12)
+>>> # any other source of nonces
+>>> nonces.use_provider(nonces.NonceProvider(fetch=my_fetch_function))
+```
+"""
+
+import threading
+
+from mainsail import rest
+from typing import Callable
+
+
+def fetch_wallet(puk: str) -> dict:
+    "Get wallet from network, empty dict if wallet is unknown."
+    return rest.WalletResolver.unwrap(rest.GET.api.wallets(puk)) or {}
+
+
+class NonceProvider:
+    """
+    Thread-safe nonce reservation per sender. Each sender wallet is fetched
+    once, then consecutive nonces are computed locally until a resync is
+    asked (for example when a transaction is rejected).
+
+    Args:
+        fetch (Callable): function returning sender wallet as dict (with
+            `nonce` field) from its public key. Default to `fetch_wallet`.
+    """
+
+    def __init__(self, fetch: Callable[[str], dict] = None) -> None:
+        self.fetch = fetch or fetch_wallet
+        self._next = {}
+        self._wallets = {}
+        self._lock = threading.RLock()
+
+    def _sync(self, puk: str) -> None:
+        # network failure leaves sender unsynced so next call retries
+        try:
+            wallet = self.fetch(puk)
+        except Exception:
+            return
+        self._wallets[puk] = wallet
+        self._next[puk] = int(wallet.get("nonce", 0)) + 1
+
+    def wallet(self, puk: str) -> dict:
+        "Return sender wallet as fetched during last sync."
+        with self._lock:
+            if puk not in self._next:
+                self._sync(puk)
+            return self._wallets.get(puk, {})
+
+    def update(self, wallet: dict) -> None:
+        "Sync a sender from a wallet already fetched."
+        with self._lock:
+            self._wallets[wallet["publicKey"]] = wallet
+            self._next[wallet["publicKey"]] = int(wallet["nonce"]) + 1
+
+    def peek(self, puk: str) -> int:
+        "Return the next nonce of sender without reserving it."
+        with self._lock:
+            if puk not in self._next:
+                self._sync(puk)
+            return self._next.get(puk, 1)
+
+    def reserve(self, puk: str, count: int = 1) -> int:
+        """
+        Reserve `count` consecutive nonces for sender.
+
+        Returns:
+            int: the first reserved nonce.
+        """
+        with self._lock:
+            nonce = self.peek(puk)
+            self._next[puk] = nonce + count
+            return nonce
+
+    def commit(self, puk: str, nonce: int) -> None:
+        "Mark `nonce` as used by sender."
+        with self._lock:
+            self._next[puk] = max(self._next.get(puk, 1), nonce + 1)
+
+    def set(self, puk: str, nonce: int) -> None:
+        "Set the next nonce to be used by sender, no network call needed."
+        with self._lock:
+            self._next[puk] = nonce
+
+    def resync(self, puk: str = None) -> None:
+        "Drop local state of a sender (all if None), next call syncs."
+        with self._lock:
+            if puk is None:
+                self._next.clear()
+                self._wallets.clear()
+            else:
+                self._next.pop(puk, None)
+                self._wallets.pop(puk, None)
+
+
+# shared nonce provider
+PROVIDER = NonceProvider()
+
+
+def use_provider(provider: NonceProvider) -> None:
+    "Replace the shared nonce provider."
+    global PROVIDER
+    PROVIDER = provider
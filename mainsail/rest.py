@@ -4,12 +4,25 @@ Network endpoint managment module.
 """
 
 import re
+import copy
+import bisect
+import time
+import asyncio
+import hashlib
+import logging
+import binascii
 import requests
+import functools
+import threading
 
-from typing import Union
-from mainsail import config
+from typing import Union, Iterator, Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from mainsail import config, codec
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode, urlparse, urlunparse
-from collections import namedtuple
+from collections import namedtuple, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # namedtuple to match the internal signature of urlunparse
 Urltuple = namedtuple(
@@ -19,10 +32,142 @@ Urltuple = namedtuple(
 )
 
 
+# set basic logging
+logging.basicConfig()
+LOGGER = logging.getLogger(__name__)
+
+# default (connect, read) timeouts in seconds
+TIMEOUT = (5, 30)
+# retries of calls throttled by peers
+RETRIES = 3
+# hedging delay in seconds used until enough latencies are measured
+HEDGE_DELAY = 1.0
+# port names used by root endpoints
+API_PORTS = [
+    "api-http", "api-development", "core-api", "api-transaction-pool",
+    "api-webhook", "core-webhooks"
+]
+# HTTP methods of requests module functions
+METHODS = {
+    requests.get: "GET", requests.post: "POST", requests.delete: "DELETE",
+    requests.put: "PUT", requests.head: "HEAD"
+}
+
+
 class ApiError(Exception):
     pass
 
 
+class SessionPool(object):
+    """
+    Thread-safe registry of keep-alive `requests.Session`, one per peer
+    (scheme and network location). Each session mounts an `HTTPAdapter`
+    holding up to `pool_size` reusable connections so concurrent threads
+    talking to the same peer do not open a new TCP connection per call.
+    A thread pool of `pool_size` workers (`executor`) is provided to run
+    blocking calls concurrently and a larger one of `async_size` workers
+    (`async_executor`) runs calls awaited through `AsyncEndPoint`.
+
+    Args:
+        pool_size (int): maximum connections kept alive per peer.
+        timeout (float|tuple): default `(connect, read)` timeouts.
+        async_size (int): maximum awaited calls in flight.
+    """
+
+    def __init__(
+        self, pool_size: int = 10, timeout: tuple = TIMEOUT,
+        async_size: int = 64
+    ) -> None:
+        self.pool_size = pool_size
+        self.async_size = async_size
+        self.timeout = timeout
+        self._sessions = {}
+        self._executor = None
+        self._async_executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        "Thread pool sized on `pool_size`, created on first use."
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.pool_size,
+                        thread_name_prefix="mainsail-rest"
+                    )
+        return self._executor
+
+    @property
+    def async_executor(self) -> ThreadPoolExecutor:
+        "Thread pool sized on `async_size`, created on first use."
+        if self._async_executor is None:
+            with self._lock:
+                if self._async_executor is None:
+                    self._async_executor = ThreadPoolExecutor(
+                        max_workers=self.async_size,
+                        thread_name_prefix="mainsail-async"
+                    )
+        return self._async_executor
+
+    def get(self, base_url: Urltuple) -> requests.Session:
+        "Return the session bound to `base_url` peer, create it if needed."
+        key = (base_url.scheme, base_url.netloc)
+        session = self._sessions.get(key, None)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key, None)
+                if session is None:
+                    session = requests.Session()
+                    session.headers["Accept-Encoding"] = "gzip, deflate"
+                    # awaited calls may all target the same peer
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=max(self.pool_size, self.async_size)
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._sessions[key] = session
+        return session
+
+    def request(
+        self, method: str, url: str, timeout: tuple = None, **kwargs
+    ) -> requests.Response:
+        "Send an HTTP request through the session of `url` peer."
+        return self.get(urlparse(url)).request(
+            method, url, timeout=timeout or self.timeout, **kwargs
+        )
+
+    def configure(
+        self, pool_size: int = None, timeout: tuple = None,
+        async_size: int = None
+    ) -> None:
+        """
+        Change pool sizes and/or default timeouts. Opened sessions are closed
+        so new settings apply to next calls.
+        """
+        if timeout is not None:
+            self.timeout = timeout
+        if async_size is not None:
+            self.async_size = async_size
+        if pool_size is not None:
+            self.pool_size = pool_size
+        if pool_size is not None or async_size is not None:
+            self.close()
+
+    def close(self) -> None:
+        "Close all sessions, their pooled connections and the thread pools."
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            executors = [self._executor, self._async_executor]
+            self._executor = self._async_executor = None
+        for session in sessions.values():
+            session.close()
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+
 class Peer(dict):
 
     ip_port = r'([0-9]+(?:\.[0-9]+){3})(:[0-9]+)?'
@@ -45,49 +190,694 @@ class Peer(dict):
             )
 
 
+class PeerScheduler(object):
+    """
+    Thread-safe peer selection based on what was observed from this host.
+    Each peer gets an exponentially weighted moving average (EWMA) of its
+    response time and of its error rate. A peer failing `max_errors` times
+    in a row is ejected for `cooldown` seconds, doubled on each new
+    ejection and reset on first success. Recent call durations are also
+    kept per request path so that percentiles of small and large calls do
+    not mix.
+
+    Args:
+        alpha (float): EWMA smoothing factor in `]0, 1]`.
+        max_errors (int): consecutive failures before ejection.
+        cooldown (float): base ejection duration in seconds.
+        maxpaths (int): maximum number of path windows kept.
+    """
+
+    def __init__(
+        self, alpha: float = 0.3, max_errors: int = 3, cooldown: float = 30.,
+        maxpaths: int = 256
+    ) -> None:
+        self.alpha = alpha
+        self.max_errors = max_errors
+        self.cooldown = cooldown
+        self.maxpaths = maxpaths
+        self._stats = {}
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(peer: dict) -> str:
+        "Peer identifier: host of `url` field or `ip` field."
+        if "url" in peer:
+            return urlparse(peer["url"]).netloc
+        return peer.get("ip", "127.0.0.1")
+
+    def _get(self, peer: dict) -> dict:
+        key = PeerScheduler.key(peer)
+        stat = self._stats.get(key, None)
+        if stat is None:
+            stat = self._stats[key] = {
+                # initial guess is the latency reported by seed node if any
+                "latency": float(peer.get("latency", 0)), "errors": 0.,
+                "failures": 0, "ejections": 0, "ejected": 0., "calls": 0
+            }
+        return stat
+
+    def score(self, peer: dict) -> float:
+        "Expected cost of a peer: latency in ms penalized by error rate."
+        with self._lock:
+            stat = self._get(peer)
+            return stat["latency"] * (1. + 10. * stat["errors"])
+
+    def percentile(self, q: float, path: str = None) -> Union[float, None]:
+        """
+        Return the `q`-th percentile of recent successful call durations to
+        `path` in milliseconds, or `None` if not enough calls were measured.
+        """
+        with self._lock:
+            window = sorted(self._windows.get(path, []))
+        if len(window) < 10:
+            return None
+        return window[min(len(window) - 1, int(q / 100. * len(window)))]
+
+    def select(
+        self, ports: list, peers: list = None, exclude: list = []
+    ) -> Union[dict, None]:
+        """
+        Return the best peer with one of `ports` enabled or `None`. Ejected
+        peers are only returned when no healthy one is available.
+
+        Args:
+            ports (list): attended port names.
+            peers (list): peers to choose from. Default to `config.peers`.
+            exclude (list): peers not to be selected.
+        """
+        now = time.monotonic()
+        ports = set(ports)
+        exclude = set(PeerScheduler.key(peer) for peer in exclude)
+        best, best_score, fallback = None, None, None
+        with self._lock:
+            for peer in list(
+                getattr(config, "peers", []) if peers is None else peers
+            ):
+                if not ports & set(peer.get("ports", {}).keys()) or \
+                   PeerScheduler.key(peer) in exclude:
+                    continue
+                stat = self._get(peer)
+                if stat["ejected"] > now:
+                    if fallback is None or \
+                       stat["ejected"] < self._get(fallback)["ejected"]:
+                        fallback = peer
+                    continue
+                score = stat["latency"] * (1. + 10. * stat["errors"])
+                if best is None or score < best_score:
+                    best, best_score = peer, score
+        return fallback if best is None else best
+
+    def success(self, peer: dict, elapsed: float, path: str = None) -> None:
+        "Record a successful call to `path` lasting `elapsed` milliseconds."
+        with self._lock:
+            stat = self._get(peer)
+            window = self._windows.get(path, None)
+            if window is None:
+                window = self._windows[path] = deque(maxlen=256)
+                while len(self._windows) > self.maxpaths:
+                    self._windows.popitem(last=False)
+            self._windows.move_to_end(path)
+            window.append(elapsed)
+            stat["calls"] += 1
+            stat["latency"] = elapsed if stat["calls"] == 1 else \
+                self.alpha * elapsed + (1 - self.alpha) * stat["latency"]
+            stat["errors"] *= (1 - self.alpha)
+            stat["failures"] = stat["ejections"] = 0
+            stat["ejected"] = 0.
+
+    def failure(self, peer: dict, elapsed: float = None) -> None:
+        "Record a failed call, eject peer if it keeps failing."
+        with self._lock:
+            stat = self._get(peer)
+            stat["calls"] += 1
+            if elapsed is not None:
+                stat["latency"] = max(stat["latency"], elapsed)
+            stat["errors"] = self.alpha + (1 - self.alpha) * stat["errors"]
+            stat["failures"] += 1
+            if stat["failures"] >= self.max_errors:
+                stat["ejected"] = time.monotonic() + \
+                    self.cooldown * 2 ** stat["ejections"]
+                stat["ejections"] += 1
+                stat["failures"] = 0
+
+    def stats(self) -> dict:
+        "Return a copy of peer statistics."
+        with self._lock:
+            return dict((k, dict(v)) for k, v in self._stats.items())
+
+    def reset(self) -> None:
+        "Forget all statistics."
+        with self._lock:
+            self._stats.clear()
+            self._windows.clear()
+
+
+class ResponseCache(object):
+    """
+    Thread-safe and size-bounded LRU cache of parsed API responses with a
+    time-to-live per entry. Entries are keyed by endpoint path, query
+    string and scope: the host of the peer if one was given, the current
+    network otherwise. Values are copied in and out so callers can freely
+    modify what they get.
+
+    Args:
+        maxsize (int): maximum number of cached responses.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expiration, value)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str, query: dict, scope: str = None) -> tuple:
+        "Cache key of a call: path, sorted query string and scope."
+        return path, urlencode(sorted(query.items())), scope
+
+    def get(self, key: tuple) -> Union[list, dict, None]:
+        "Return a copy of cached value or `None` if missing or expired."
+        with self._lock:
+            expiration, value = self._data.get(key, (0, None))
+            if expiration > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+            self._data.pop(key, None)
+            self.misses += 1
+        return None
+
+    def set(self, key: tuple, value: Union[list, dict], ttl: float) -> None:
+        "Store a copy of value for `ttl` seconds."
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        Drop cached responses whose path starts with `prefix`, all of them
+        by default. Return the number of dropped responses.
+        """
+        with self._lock:
+            keys = [k for k in self._data if k[0].startswith(prefix)]
+            for key in keys:
+                self._data.pop(key)
+        return len(keys)
+
+    def pop(self, key: tuple) -> None:
+        "Drop a cached response."
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._data), "maxsize": self.maxsize
+        }
+
+
+class SingleFlight(object):
+    """
+    Thread-safe coalescing of identical calls: while a call is in flight,
+    any other thread asking for the same key waits for it and gets the
+    same result (or exception) instead of issuing its own call.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}  # key -> [event, result, exception]
+        self._lock = threading.Lock()
+
+    def do(self, key: tuple, func: Callable, *args, **kwargs) -> object:
+        "Return `func(*args, **kwargs)`, shared with identical calls."
+        with self._lock:
+            flight = self._flights.get(key, None)
+            if flight is None:
+                flight = self._flights[key] = [threading.Event(), None, None]
+                leader = True
+                self.calls += 1
+            else:
+                leader = False
+                self.coalesced += 1
+        if not leader:
+            flight[0].wait()
+            if flight[2] is not None:
+                raise flight[2]
+            return flight[1]
+        try:
+            flight[1] = func(*args, **kwargs)
+            return flight[1]
+        except Exception as exception:
+            flight[2] = exception
+            raise
+        finally:
+            # next identical calls will be issued again
+            with self._lock:
+                self._flights.pop(key, None)
+            flight[0].set()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls, "coalesced": self.coalesced,
+            "in_flight": len(self._flights)
+        }
+
+
+class Metrics(object):
+    """
+    Client side instrumentation of endpoint calls: latency histograms per
+    endpoint path and per peer, bytes in/out, response status codes and
+    events (retries, hedges, cache hits...). Disabled by default, a
+    disabled instance costs one attribute lookup per call.
+
+    ```python
+    >>> from mainsail import rest
+    >>> rest.METRICS.enable()
+    >>> rest.GET.api.wallets.toons()
+    >>> rest.METRICS.snapshot()["paths"]["api/wallets"]["count"]
+    1
+    >>> print(rest.METRICS.exposition())
+    ```
+
+    Args:
+        buckets (tuple): upper bounds of latency histograms in ms.
+    """
+
+    def __init__(
+        self, buckets: tuple = (
+            5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+        )
+    ) -> None:
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, value: bool = True) -> None:
+        self.enabled = value
+
+    def reset(self) -> None:
+        "Forget all measures."
+        with self._lock:
+            self._paths = {}
+            self._peers = {}
+            self._events = {}
+
+    def _histogram(self, store: dict, label: str) -> dict:
+        histogram = store.get(label, None)
+        if histogram is None:
+            histogram = store[label] = {
+                "buckets": [0] * (len(self.buckets) + 1), "sum": 0.,
+                "count": 0, "bytes_in": 0, "bytes_out": 0, "status": {}
+            }
+        return histogram
+
+    def observe(
+        self, path: str, peer: str, elapsed: float, status: Union[int, str],
+        bytes_in: int = 0, bytes_out: int = 0
+    ) -> None:
+        """
+        Record a call.
+
+        Args:
+            path (str): endpoint path.
+            peer (str): peer identifier.
+            elapsed (float): call duration in ms.
+            status (int|str): HTTP status code or error name.
+            bytes_in (int): size of response body.
+            bytes_out (int): size of request body.
+        """
+        index = bisect.bisect_left(self.buckets, elapsed)
+        status = str(status)
+        with self._lock:
+            for store, label in ((self._paths, path), (self._peers, peer)):
+                histogram = self._histogram(store, label)
+                histogram["buckets"][index] += 1
+                histogram["sum"] += elapsed
+                histogram["count"] += 1
+                histogram["bytes_in"] += bytes_in
+                histogram["bytes_out"] += bytes_out
+                histogram["status"][status] = \
+                    histogram["status"].get(status, 0) + 1
+
+    def count(self, event: str, path: str = "") -> None:
+        "Count an event (`retry`, `hedge`, `cache_hit`...) on a path."
+        with self._lock:
+            events = self._events.setdefault(event, {})
+            events[path] = events.get(path, 0) + 1
+
+    def snapshot(self) -> dict:
+        "Return a copy of all measures."
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "paths": copy.deepcopy(self._paths),
+                "peers": copy.deepcopy(self._peers),
+                "events": copy.deepcopy(self._events)
+            }
+
+    def exposition(self, prefix: str = "mainsail_rest") -> str:
+        "Return all measures in Prometheus text exposition format."
+        snapshot = self.snapshot()
+        lines = []
+        for kind, label in (("paths", "path"), ("peers", "peer")):
+            name = f"{prefix}_{label}_latency_ms"
+            lines.append(f"# TYPE {name} histogram")
+            for value, histogram in sorted(snapshot[kind].items()):
+                cumulative = 0
+                for bound, count in zip(
+                    self.buckets + ("+Inf",), histogram["buckets"]
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{label}="{value}",le="{bound}"}} '
+                        f'{cumulative}'
+                    )
+                lines.append(
+                    f'{name}_sum{{{label}="{value}"}} {histogram["sum"]:.3f}'
+                )
+                lines.append(
+                    f'{name}_count{{{label}="{value}"}} {histogram["count"]}'
+                )
+            for field in ("bytes_in", "bytes_out"):
+                name = f"{prefix}_{label}_{field}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(
+                    f'{name}{{{label}="{value}"}} {histogram[field]}'
+                    for value, histogram in sorted(snapshot[kind].items())
+                )
+            name = f"{prefix}_{label}_responses_total"
+            lines.append(f"# TYPE {name} counter")
+            for value, histogram in sorted(snapshot[kind].items()):
+                lines.extend(
+                    f'{name}{{{label}="{value}",status="{status}"}} {count}'
+                    for status, count in sorted(histogram["status"].items())
+                )
+        name = f"{prefix}_events_total"
+        lines.append(f"# TYPE {name} counter")
+        for event, paths in sorted(snapshot["events"].items()):
+            lines.extend(
+                f'{name}{{event="{event}",path="{path}"}} {count}'
+                for path, count in sorted(paths.items())
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _retry_after(value: str) -> Union[float, None]:
+    "Parse a `Retry-After` header value (seconds or HTTP date)."
+    if value is None:
+        return None
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0., (
+            parsedate_to_datetime(value) - datetime.now(timezone.utc)
+        ).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_reset(error: BaseException) -> bool:
+    "Tell if a connection error is caused by a reset from peer."
+    return isinstance(error, ConnectionResetError) or any(
+        _is_reset(arg) for arg in error.args if isinstance(arg, BaseException)
+    )
+
+
+class PeerLimiter(object):
+    """
+    Thread-safe per-peer throttling combining a token bucket (request rate)
+    and an AIMD concurrency window. Each throttling signal (HTTP 429, 503
+    with `Retry-After` or connection reset) halves peer rate and window and
+    blocks the peer for `Retry-After` seconds (`backoff` if not given).
+    Each successful call increases the window by `1/window` and the rate
+    by one request per second, up to the initial values.
+
+    Args:
+        rate (float): maximum requests per second per peer.
+        burst (int): token bucket capacity.
+        limit (int): initial concurrent requests per peer.
+        max_limit (int): maximum concurrent requests per peer.
+        backoff (float): blocking delay in seconds without `Retry-After`.
+        max_backoff (float): maximum blocking delay in seconds.
+    """
+
+    def __init__(
+        self, rate: float = 50., burst: int = 50, limit: int = 8,
+        max_limit: int = 64, backoff: float = 1., max_backoff: float = 60.
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.limit = limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._peers = {}
+        self._condition = threading.Condition()
+
+    def _get(self, peer: dict) -> dict:
+        key = PeerScheduler.key(peer)
+        state = self._peers.get(key, None)
+        if state is None:
+            state = self._peers[key] = {
+                "tokens": float(self.burst), "rate": float(self.rate),
+                "limit": float(self.limit), "in_flight": 0, "blocked": 0.,
+                "stamp": time.monotonic(), "throttled": 0
+            }
+        return state
+
+    def acquire(self, peer: dict) -> None:
+        "Wait until a request can be sent to peer."
+        with self._condition:
+            state = self._get(peer)
+            while True:
+                now = time.monotonic()
+                state["tokens"] = min(
+                    self.burst,
+                    state["tokens"] + (now - state["stamp"]) * state["rate"]
+                )
+                state["stamp"] = now
+                delay = max(
+                    state["blocked"] - now,
+                    (1. - state["tokens"]) / state["rate"]
+                )
+                if delay <= 0 and state["in_flight"] < int(state["limit"]):
+                    state["tokens"] -= 1.
+                    state["in_flight"] += 1
+                    return
+                # wait for the delay or for a request to be released
+                self._condition.wait(delay if delay > 0 else None)
+
+    def release(
+        self, peer: dict, throttled: bool = False, retry_after: float = None
+    ) -> None:
+        "Release a request slot and adapt peer limits."
+        with self._condition:
+            state = self._get(peer)
+            state["in_flight"] -= 1
+            if throttled:
+                state["throttled"] += 1
+                state["limit"] = max(1., state["limit"] / 2)
+                state["rate"] = max(1., state["rate"] / 2)
+                state["blocked"] = max(
+                    state["blocked"], time.monotonic() + min(
+                        self.max_backoff,
+                        self.backoff if retry_after is None else retry_after
+                    )
+                )
+            else:
+                state["limit"] = min(
+                    self.max_limit, state["limit"] + 1. / state["limit"]
+                )
+                state["rate"] = min(self.rate, state["rate"] + 1.)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        "Return a copy of peer limits."
+        with self._condition:
+            return dict((k, dict(v)) for k, v in self._peers.items())
+
+
+class ValidatorCache(object):
+    """
+    Thread-safe and size-bounded LRU store of HTTP validators (`ETag` and
+    `Last-Modified`) and response bodies per URL. Conditional headers are
+    sent on next GET of the same URL and the stored body is served when
+    peer answers `304 Not Modified`.
+
+    Args:
+        maxsize (int): maximum number of stored bodies.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # url -> (etag, last modified, content, status)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def headers(self, url: str) -> dict:
+        "Return conditional headers to be sent with a GET of `url`."
+        with self._lock:
+            etag, modified, _, _ = self._data.get(url, (None,) * 4)
+        result = {}
+        if etag is not None:
+            result["If-None-Match"] = etag
+        if modified is not None:
+            result["If-Modified-Since"] = modified
+        return result
+
+    def resolve(
+        self, url: str, resp: requests.Response
+    ) -> Union[requests.Response, None]:
+        """
+        If `resp` is a `304 Not Modified`, return it with stored body and
+        status or `None` if nothing is stored anymore (evicted meanwhile).
+        Store `resp` validators and body otherwise.
+        """
+        status = getattr(resp, "status_code", None)
+        with self._lock:
+            if status == 304:
+                stored = self._data.get(url, None)
+                if stored is None:
+                    return None
+                self._data.move_to_end(url)
+                self.hits += 1
+                resp._content, resp.status_code = stored[2:]
+                return resp
+            if status == 200:
+                self.misses += 1
+                etag = resp.headers.get("ETag", None)
+                modified = resp.headers.get("Last-Modified", None)
+                if etag is None and modified is None:
+                    self._data.pop(url, None)
+                    return resp
+                self._data[url] = (etag, modified, resp.content, status)
+                self._data.move_to_end(url)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return resp
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._data), "maxsize": self.maxsize
+        }
+
+
 class EndPoint(object):
 
     def __init__(self, *path, **opt) -> None:
         self.headers = opt.pop("headers", {'Content-type': 'application/json'})
         self.ports = opt.pop("ports", "api-development")
         self.func = opt.pop("func", requests.get)
+        self.timeout = opt.pop("timeout", None)
+        self.hedge = opt.pop("hedge", None)
+        self.ttl = opt.pop("ttl", None)
         self.path = "/".join(path)
 
+    def _options(self) -> dict:
+        return dict(
+            headers=self.headers, func=self.func, ports=self.ports,
+            timeout=self.timeout, hedge=self.hedge, ttl=self.ttl
+        )
+
     def __getattr__(self, attr: str) -> object:
         if attr not in object.__getattribute__(self, "__dict__"):
             if self.path == "":
-                return EndPoint(
-                    attr, headers=self.headers, func=self.func,
-                    ports=self.ports
-                )
+                return self.__class__(attr, **self._options())
             else:
-                return EndPoint(
-                    self.path, attr, headers=self.headers, func=self.func,
-                    ports=self.ports
-                )
+                return self.__class__(self.path, attr, **self._options())
         else:
             return object.__getattribute__(self, attr)
 
-    def __call__(self, *path, **data) -> Union[list, dict, requests.Response]:
+    def _hedging(
+        self, path: tuple = (), data: dict = {}
+    ) -> Union[float, None]:
+        """
+        Return hedging delay in seconds if hedging is enabled, `None`
+        otherwise. Only idempotent GET calls are hedged and calls pinned to
+        a peer are never sent elsewhere.
+        """
+        if not self.hedge or self.func is not requests.get or \
+           data.get("peer", None) is not None:
+            return None
+        delay = SCHEDULER.percentile(
+            self.hedge, "/" + "/".join((self.path,) + path)
+        )
+        return HEDGE_DELAY if delay is None else delay / 1000.
+
+    def _cache_key(self, path: tuple, data: dict) -> Union[tuple, None]:
+        """
+        Return cache key of the call if response caching is enabled, `None`
+        otherwise. Only GET calls are cached.
+        """
+        if not self.ttl or self.func is not requests.get:
+            return None
+        query = dict(
+            (k, v) for k, v in data.items() if k not in ("peer", "headers")
+        )
+        # responses from a given peer or from current network only
+        peer = data.get("peer", None)
+        return ResponseCache.key(
+            "/".join((self.path,) + path), query,
+            PeerScheduler.key(peer) if peer else
+            getattr(config, "nethash", None)
+        )
+
+    def _lookup(self, key: tuple) -> Union[list, dict, None]:
+        if key is None:
+            return None
+        result = CACHE.get(key)
+        if METRICS.enabled:
+            METRICS.count(
+                "cache_miss" if result is None else "cache_hit", self.path
+            )
+        return result
+
+    def _store(
+        self, key: tuple, resp: requests.Response,
+        result: Union[list, dict, requests.Response]
+    ) -> Union[list, dict, requests.Response]:
+        if key is not None and isinstance(result, (list, dict)) and \
+           getattr(resp, "status_code", 200) < 400:
+            CACHE.set(key, result, self.ttl)
+        return result
+
+    def _prepare(self, *path, **data) -> tuple:
+        """
+        Select a peer and build request. Return a tuple `(peer, url, kwargs)`
+        to be sent with `_send`.
+        """
         headers = data.pop("headers", self.headers)
         peer = data.pop("peer", False)
-        n = len(getattr(config, "peers", []))
-        ports = set([])  # void set
-        # tries to fetch a valid peer
-        while peer is False and n >= 0:
-            # pot peer from available network peers and put it in the end
-            peer = config.peers.pop(0)
-            config.peers.append(peer)
-            # match attended ports and enabled ports
-            ports = set(self.ports) & set(peer.get("ports", {}).keys())
-            peer = False if not len(ports) else peer
-            n -= 1
-        # if unsuccessful
-        if peer is False:
-            raise ApiError(
-                f"no peer available with '{self.ports}' port enabled"
-            )
-        # else do HTTP request call
+        if peer is False or peer is None:
+            peer = SCHEDULER.select(self.ports)
+            # if unsuccessful
+            if peer is None:
+                raise ApiError(
+                    f"no peer available with '{self.ports}' port enabled"
+                )
+        ports = set(self.ports) & set(peer.get("ports", {}).keys())
         # build an Urltuple to be updated according to needs
         if "url" in peer:
             base_url = urlparse(peer["url"])
@@ -107,36 +897,549 @@ class EndPoint(object):
             )
         base_url = base_url._replace(path='/'.join((self.path,) + path))
         if self.func in (requests.post, requests.delete):
-            resp = self.func(urlunparse(base_url), headers=headers, json=data)
+            kwargs = dict(headers=headers, json=data)
         else:
             base_url = base_url._replace(query=urlencode(data))
-            resp = self.func(urlunparse(base_url), headers=headers)
+            kwargs = dict(headers=headers)
+        return peer, urlunparse(base_url), kwargs
+
+    def _send(self, peer: dict, url: str, **kwargs) -> requests.Response:
+        # identical GET calls to the same peer share a single request
+        if self.func is requests.get:
+            key = (url, tuple(sorted(kwargs.get("headers", {}).items())))
+            return FLIGHTS.do(key, self._request, peer, url, **kwargs)
+        return self._request(peer, url, **kwargs)
+
+    def _request(self, peer: dict, url: str, **kwargs) -> requests.Response:
+        # throttled calls are retried once peer limiter allows it
+        for attempt in range(RETRIES + 1):
+            LIMITER.acquire(peer)
+            try:
+                resp = self._call(peer, url, **kwargs)
+            except requests.exceptions.ConnectionError as error:
+                # connection reset by peer is a throttling signal
+                LIMITER.release(peer, throttled=_is_reset(error))
+                raise
+            except Exception:
+                LIMITER.release(peer)
+                raise
+            status = getattr(resp, "status_code", 200)
+            headers = getattr(resp, "headers", {})
+            throttled = status == 429 or \
+                (status == 503 and "Retry-After" in headers)
+            LIMITER.release(
+                peer, throttled, _retry_after(headers.get("Retry-After"))
+            )
+            if not throttled or attempt == RETRIES:
+                return resp
+            if METRICS.enabled:
+                METRICS.count("retry", self.path)
+            LOGGER.debug("%s throttled with status %s", url, status)
 
+    def _call(
+        self, peer: dict, url: str, revalidate: bool = True, **kwargs
+    ) -> requests.Response:
+        method = METHODS.get(self.func, None)
+        headers = kwargs.get("headers", None)
+        conditional = {}
+        if method == "GET" and revalidate:
+            # revalidate previous response of the same url if any
+            conditional = VALIDATORS.headers(url)
+            if conditional:
+                kwargs["headers"] = dict(headers or {}, **conditional)
+        start = time.perf_counter()
         try:
-            return resp.json()
-        except requests.exceptions.JSONDecodeError:
+            # requests module functions are routed through pooled sessions
+            if method is not None:
+                resp = SESSIONS.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+            else:
+                resp = self.func(url, **kwargs)
+        except requests.exceptions.RequestException as error:
+            elapsed = (time.perf_counter() - start) * 1000
+            SCHEDULER.failure(peer, elapsed)
+            if METRICS.enabled:
+                METRICS.observe(
+                    self.path, PeerScheduler.key(peer), elapsed,
+                    error.__class__.__name__
+                )
+            LOGGER.debug("%s failed after %.1f ms: %r", url, elapsed, error)
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        status = getattr(resp, "status_code", 200)
+        if status >= 500:
+            SCHEDULER.failure(peer, elapsed)
+        else:
+            SCHEDULER.success(peer, elapsed, urlparse(url).path)
+        if METRICS.enabled:
+            body = getattr(getattr(resp, "request", None), "body", None)
+            # bytes received on the wire, compressed if so
+            received = getattr(resp, "headers", {}).get("Content-Length")
+            METRICS.observe(
+                self.path, PeerScheduler.key(peer), elapsed, status,
+                int(received) if received is not None else
+                len(getattr(resp, "content", b"") or b""),
+                len(body or b"")
+            )
+            if status == 304:
+                METRICS.count("not_modified", self.path)
+        LOGGER.debug("%s answered %s in %.1f ms", url, status, elapsed)
+        if method == "GET":
+            result = VALIDATORS.resolve(url, resp)
+            if result is None and conditional:
+                # stored body evicted since conditional headers were sent
+                kwargs["headers"] = headers
+                return self._call(peer, url, False, **kwargs)
+            return resp if result is None else result
+        return resp
+
+    @staticmethod
+    def _parse(
+        resp: requests.Response
+    ) -> Union[list, dict, requests.Response]:
+        try:
+            return codec.loads(resp.content)
+        except ValueError:
             return resp
 
+    def _hedged(self, delay: float, *path, **data) -> requests.Response:
+        """
+        Send request to a first peer and, if it did not answer within `delay`
+        seconds, to a second one. First good response is returned and the
+        other call is cancelled if not started yet (a running call ends in
+        background and its connection goes back to the pool).
+        """
+        executor = SESSIONS.executor
+        peer, url, kwargs = self._prepare(*path, **dict(data))
+        pending = set([executor.submit(self._send, peer, url, **kwargs)])
+        if not wait(pending, timeout=delay)[0]:
+            data["peer"] = SCHEDULER.select(self.ports, exclude=[peer])
+            if data["peer"] is not None:
+                peer, url, kwargs = self._prepare(*path, **data)
+                pending.add(executor.submit(self._send, peer, url, **kwargs))
+                if METRICS.enabled:
+                    METRICS.count("hedge", self.path)
+        resp = error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    resp = future.result()
+                except requests.exceptions.RequestException as exception:
+                    error = exception
+                    continue
+                if resp.status_code < 500:
+                    for future in pending:
+                        future.cancel()
+                    return resp
+        if resp is None:
+            raise error
+        return resp
 
-def use_network(peer: str) -> None:
-    config._clear()
-    base_url = urlparse(peer)
+    def __call__(self, *path, **data) -> Union[list, dict, requests.Response]:
+        key = self._cache_key(path, data)
+        result = self._lookup(key)
+        if result is not None:
+            return result
+        delay = self._hedging(path, data)
+        if delay is not None:
+            resp = self._hedged(delay, *path, **data)
+        else:
+            peer, url, kwargs = self._prepare(*path, **data)
+            resp = self._send(peer, url, **kwargs)
+        return self._store(key, resp, self._parse(resp))
+
+
+class AsyncEndPoint(EndPoint):
+    """
+    Awaitable endpoint with the same path building, peer selection and
+    `ports` matching than `EndPoint`. Requests and response decoding are
+    run through `SESSIONS.async_executor`, so at most `SESSIONS.async_size`
+    calls (64 by default) are in flight at once, each peer being also
+    bounded by `LIMITER`, while the event loop stays free and pooled
+    keep-alive connections are reused.
+
+    ```python
+    >>> import asyncio
+    >>> from mainsail import rest
+    >>> # allow more awaited calls in flight
+    >>> rest.SESSIONS.configure(async_size=128)
+    >>> async def main(*usernames):
+    ...     return await asyncio.gather(
+    ...         *[rest.AGET.api.wallets(name) for name in usernames]
+    ...     )
+    >>> asyncio.run(main("toons", "arkpool"))
+    ```
+    """
+
+    def _fetch(
+        self, key: tuple, path: tuple, data: dict
+    ) -> Union[list, dict, requests.Response]:
+        delay = self._hedging(path, data)
+        if delay is not None:
+            resp = self._hedged(delay, *path, **data)
+        else:
+            peer, url, kwargs = self._prepare(*path, **data)
+            resp = self._send(peer, url, **kwargs)
+        return self._store(key, resp, self._parse(resp))
+
+    async def __call__(
+        self, *path, **data
+    ) -> Union[list, dict, requests.Response]:
+        key = self._cache_key(path, data)
+        result = self._lookup(key)
+        if result is not None:
+            return result
+        # blocking call and JSON decoding both run out of the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            SESSIONS.async_executor,
+            functools.partial(self._fetch, key, path, data)
+        )
+
+
+def paginate(
+    endpoint: EndPoint, *path, window: int = 4, **data
+) -> Iterator[dict]:
+    """
+    Iterate over items of a paginated API endpoint. The first page gives
+    `meta.pageCount` (or `meta.totalCount`) then remaining pages are
+    fetched concurrently, at most `window` pages ahead of the consumer.
+    Items are yielded in page order. If page count is not available, pages
+    are followed one by one using `meta.next`.
+
+    ```python
+    >>> from mainsail import rest
+    >>> voters = dict(
+    ...     (v["address"], int(v["balance"])) for v in rest.paginate(
+    ...         rest.GET.api.delegates, "toons", "voters", limit=100
+    ...     )
+    ... )
+    ```
+
+    Args:
+        endpoint (EndPoint): endpoint to be called.
+        *path (str): path items passed to endpoint.
+        window (int): maximum number of pages fetched ahead.
+        **data (dict): query parameters, `peer` and `headers` passed to
+            endpoint.
+
+    Yields:
+        dict: items found in `data` field of each page.
+
+    Raises:
+        ApiError: if a page is not a valid API response.
+    """
+    def get(page: int) -> list:
+        resp = endpoint(*path, page=page, **data)
+        if not isinstance(resp, dict):
+            raise ApiError(f"page {page} not available: {resp}")
+        return resp
+
+    first = get(1)
+    yield from first.get("data", [])
+    meta = first.get("meta", {}) or {}
+    page_count = meta.get("pageCount", None)
+    if page_count is None and meta.get("totalCount", None) is not None:
+        size = data.get("limit", len(first.get("data", []))) or 1
+        page_count = -(-int(meta["totalCount"]) // int(size))
+    # no page count available, follow next pages
+    if page_count is None:
+        page = 1
+        while meta.get("next", None) is not None:
+            page += 1
+            resp = get(page)
+            yield from resp.get("data", [])
+            meta = resp.get("meta", {}) or {}
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, window), thread_name_prefix="mainsail-pages"
+    )
+    pages, futures = iter(range(2, page_count + 1)), deque()
+    try:
+        for page in pages:
+            futures.append(executor.submit(get, page))
+            if len(futures) >= window:
+                break
+        while futures:
+            items = futures.popleft().result().get("data", [])
+            page = next(pages, None)
+            if page is not None:
+                futures.append(executor.submit(get, page))
+            yield from items
+    finally:
+        # consumer stopped or a page failed
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def broadcast(
+    transactions: list, peers: list = [], fanout: int = 3,
+    chunk_size: int = None, candidates: list = None
+) -> dict:
+    """
+    Send serialized transactions to several transaction pools at once.
+    Transactions are split into chunks accepted by pools in a single
+    request and each chunk is posted concurrently to every peer. Results
+    are merged per transaction id: a transaction accepted by one peer is
+    accepted, it is invalid or in excess only if no peer accepted it.
+
+    ```python
+    >>> from mainsail import rest
+    >>> rest.broadcast(registry, peers=[rest.Peer("http://127.0.0.1:4007")])
+    {'data': {'accept': [...], 'broadcast': [...], 'invalid': [], \
+'excess': []}, 'errors': {}}
+    ```
+
+    Args:
+        transactions (list): serialized transactions as hex strings.
+        peers (list): peers to be used in any case.
+        fanout (int): minimum number of peers, completed with best
+            `candidates` having `api-transaction-pool` port enabled.
+        chunk_size (int): number of transactions per request, default to
+            network `transactionPool.maxTransactionsPerRequest` or 40.
+        candidates (list): peers to complete `peers` with, default to
+            `config.peers`.
+
+    Returns:
+        dict: transaction ids in `data` lists and errors per transaction id.
+    """
+    peers = list(peers)
+    while len(peers) < fanout:
+        peer = SCHEDULER.select(POST.ports, candidates, exclude=peers)
+        if peer is None or PeerScheduler.key(peer) in \
+           [PeerScheduler.key(p) for p in peers]:
+            break
+        peers.append(peer)
+    if not len(peers):
+        raise ApiError(f"no peer available with '{POST.ports}' port enabled")
+
+    chunk_size = chunk_size or getattr(config, "transactionPool", {}).get(
+        "maxTransactionsPerRequest", 40
+    )
+    ids = [
+        hashlib.sha256(binascii.unhexlify(serial)).hexdigest()
+        for serial in transactions
+    ]
+    futures = dict(
+        (
+            SESSIONS.executor.submit(
+                POST.api.transactions,
+                transactions=transactions[i:i + chunk_size], peer=peer
+            ),
+            (i, peer)
+        )
+        for i in range(0, len(transactions), chunk_size) for peer in peers
+    )
+
+    results = dict(
+        (key, set()) for key in ["accept", "broadcast", "invalid", "excess"]
+    )
+    errors = {}
+    for future, (start, peer) in futures.items():
+        chunk = ids[start:start + chunk_size]
+        try:
+            resp = future.result()
+            if not isinstance(resp, dict) or "data" not in resp:
+                raise ApiError(getattr(resp, "text", resp))
+        except Exception as error:
+            LOGGER.warning(f"broadcast to {PeerScheduler.key(peer)}: {error}")
+            for txid in chunk:
+                errors.setdefault(txid, f"{error!r}")
+            continue
+        # pools return transaction index in request or transaction id
+        for key, items in resp["data"].items():
+            if key in results:
+                results[key].update(
+                    chunk[item] if isinstance(item, int) else item
+                    for item in items
+                )
+        for item, error in resp.get("errors", {}).items():
+            item = chunk[int(item)] if item.isdigit() else item
+            errors.setdefault(item, error)
+
+    accepted = results["accept"] | results["broadcast"]
+    for key in ["invalid", "excess"]:
+        results[key] -= accepted
+    return {
+        "data": dict(
+            (key, [txid for txid in ids if txid in value])
+            for key, value in results.items()
+        ),
+        "errors": dict(
+            (txid, error) for txid, error in errors.items()
+            if txid not in accepted
+        )
+    }
+
+
+class WalletResolver(object):
+    """
+    Thread-safe wallet resolution from public keys, addresses or usernames.
+    Fetched wallets are cached for `ttl` seconds under all their
+    identifiers in a `ResponseCache`, so a wallet fetched by username is
+    then also known by public key and address. Wallets are cached per
+    network (current `config.nethash`) and are meant to map identities, not
+    to read balances or nonces.
+
+    Args:
+        ttl (float): cache duration of a wallet in seconds.
+        maxsize (int): maximum number of cached identifiers.
+        window (int): maximum concurrent API calls.
+    """
+
+    def __init__(
+        self, ttl: float = 300., maxsize: int = 4096, window: int = 16
+    ) -> None:
+        self.ttl = ttl
+        self.window = window
+        self._cache = ResponseCache(maxsize)
+
+    @staticmethod
+    def key(identifier: str) -> tuple:
+        "Cache key of an identifier on current network."
+        return ResponseCache.key(
+            identifier, {}, getattr(config, "nethash", None)
+        )
+
+    @staticmethod
+    def unwrap(resp: Union[dict, requests.Response]) -> Union[dict, None]:
+        "Return wallet from an API response, `None` if it is an error."
+        if not isinstance(resp, dict) or "error" in resp:
+            return None
+        # api may wrap wallet into data field
+        return resp.get("data", resp)
+
+    @staticmethod
+    def identifiers(wallet: dict) -> list:
+        "Return public key, address and username of a wallet if any."
+        attributes = wallet.get("attributes", {}) or {}
+        return [
+            value for value in (
+                wallet.get("publicKey", None), wallet.get("address", None),
+                wallet.get("username", None), attributes.get("username", None)
+            ) if value
+        ]
+
+    def store(self, wallet: dict) -> None:
+        "Cache wallet under all its identifiers."
+        for identifier in WalletResolver.identifiers(wallet):
+            self._cache.set(WalletResolver.key(identifier), wallet, self.ttl)
+
+    def get(self, identifier: str) -> Union[dict, None]:
+        "Return cached wallet or `None`."
+        return self._cache.get(WalletResolver.key(identifier))
+
+    def _fetch(self, identifier: str, peer: dict) -> Union[dict, None]:
+        # a failing lookup resolves to None as an unknown identifier does
+        try:
+            return WalletResolver.unwrap(
+                GET.api.wallets(identifier, peer=peer)
+            )
+        except Exception as error:
+            LOGGER.warning(f"wallet {identifier} not resolved: {error!r}")
+            return None
+
+    def resolve(self, ids: list, peer: dict = None) -> dict:
+        """
+        Return a dict mapping each identifier of `ids` to its wallet, `None`
+        if unknown or if its lookup failed. Identifiers are deduplicated and
+        those not cached are fetched concurrently.
+        """
+        ids = list(dict.fromkeys(ids))
+        result = dict((i, self.get(i)) for i in ids)
+        missing = [i for i, wallet in result.items() if wallet is None]
+        if len(missing):
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(self.window, len(missing))),
+                thread_name_prefix="mainsail-wallets"
+            ) as executor:
+                for identifier, wallet in zip(
+                    missing, executor.map(
+                        lambda i: self._fetch(i, peer), missing
+                    )
+                ):
+                    if wallet is not None:
+                        self.store(wallet)
+                        result[identifier] = copy.deepcopy(wallet)
+        return result
+
+    def invalidate(self, identifier: str = None) -> None:
+        "Forget a wallet (under all its identifiers) or all wallets."
+        if identifier is None:
+            self._cache.clear()
+            return
+        wallet = self.get(identifier)
+        for key in [identifier] + (
+            [] if wallet is None else WalletResolver.identifiers(wallet)
+        ):
+            self._cache.pop(WalletResolver.key(key))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def resolve_wallets(ids: list, peer: dict = None) -> dict:
+    """
+    Resolve public keys, addresses or usernames into wallets using shared
+    `RESOLVER`.
+
+    ```python
+    >>> from mainsail import rest
+    >>> wallets = rest.resolve_wallets(["toons", "arkpool", "toons"])
+    >>> wallets["toons"]["publicKey"]
+    '02...'
+    ```
+
+    Args:
+        ids (list): wallet identifiers.
+        peer (dict): peer to be used, default to scheduled ones.
 
-    for key, value in requests.get(
-        urlunparse(base_url._replace(path="api/node/configuration")),
-        headers={'Content-type': 'application/json'},
-    ).json().get("data", {}).items():
-        setattr(config, key, value)
-        config._track.append(key)
+    Returns:
+        dict: wallet per identifier, `None` for unknown ones.
+    """
+    return RESOLVER.resolve(ids, peer)
 
-    fees = requests.get(
-        urlunparse(base_url._replace(path="api/node/fees", query="days=30")),
-        headers={'Content-type': 'application/json'},
-    ).json().get("data", {})
-    setattr(config, "fees", fees)
-    config._track.append("fees")
 
-    get_peers(peer)
+def _get_data(
+    base_url: Urltuple, path: str, query: str = "", timeout: float = None,
+    session: requests.Session = None
+) -> object:
+    return codec.loads((session or SESSIONS).request(
+        "GET", urlunparse(base_url._replace(path=path, query=query)),
+        headers={'Content-type': 'application/json'}, timeout=timeout
+    ).content).get("data", {})
+
+
+def use_network(peer: str, crawl: bool = False) -> None:
+    """
+    Fetch and store network configuration, fees and peers from `peer`.
+    If `crawl` is `True`, peers are discovered and ranked from this host
+    using `crawl_peers` instead of using the peer list of `peer`.
+    """
+    config._clear()
+    base_url = urlparse(peer)
+    # configuration, fees and peers are fetched concurrently
+    configuration = SESSIONS.executor.submit(
+        _get_data, base_url, "api/node/configuration"
+    )
+    fees = SESSIONS.executor.submit(
+        _get_data, base_url, "api/node/fees", "days=30"
+    )
+    peers = SESSIONS.executor.submit(
+        # fall back to peers known by `peer` if none could be measured
+        (lambda: crawl_peers(peer) or fetch_peers(peer)) if crawl else
+        functools.partial(fetch_peers, peer)
+    )
+
+    for key, value in configuration.result().items():
+        config._set(key, value)
+    now = time.time()
+    config._set("fees", fees.result())
+    config._set("peers", peers.result())
+    config._set("updated", {"fees": now, "peers": now})
 
     nethash = getattr(config, "nethash", False)
     if nethash:
@@ -147,16 +1450,13 @@ def load_network(name: str) -> bool:
     return config._load(name)
 
 
-def get_peers(peer: str, latency: int = 500) -> None:
+def fetch_peers(peer: str, latency: int = 500) -> list:
+    "Return peers known by `peer` with a latency below `latency` ms."
     base_url = urlparse(peer)
     resp = sorted(
-        requests.get(
-            urlunparse(base_url._replace(path="api/peers")),
-            headers={'Content-type': 'application/json'}
-        ).json().get("data", {}),
-        key=lambda p: p["latency"]
+        _get_data(base_url, "api/peers"), key=lambda p: p["latency"]
     )
-    setattr(config, "peers", [
+    return [
         # {
         #     "ip": peer["ip"],
         #     "ports": dict(
@@ -169,14 +1469,271 @@ def get_peers(peer: str, latency: int = 500) -> None:
             "ports": dict(
                 [k.split("/")[-1], v] for k, v in peer["ports"].items()
                 if v > 0
-            )
+            ),
+            "latency": peer["latency"]
         }
         for peer in resp if peer["latency"] <= latency
-    ])
-    if "peers" not in config._track:
-        config._track.append("peers")
+    ]
+
+
+def get_peers(peer: str, latency: int = 500) -> None:
+    config._set("peers", fetch_peers(peer, latency))
+    config._set(
+        "updated", dict(getattr(config, "updated", {}), peers=time.time())
+    )
+
+
+def _probe(
+    ip: str, port: int, timeout: float, session: requests.Session
+) -> Union[float, None]:
+    "Return round-trip time in ms of an HTTP call, `None` if unavailable."
+    start = time.perf_counter()
+    try:
+        resp = session.request("GET", f"http://{ip}:{port}/", timeout=timeout)
+    except requests.exceptions.RequestException:
+        return None
+    if resp.status_code >= 500:
+        return None
+    return (time.perf_counter() - start) * 1000
+
 
+def crawl_peers(
+    seed: str, depth: int = 1, ports: list = None, max_peers: int = 100,
+    timeout: float = 2., window: int = 16
+) -> list:
+    """
+    Discover network peers from a seed and measure them from this host.
+    Peer lists are fetched from the seed and then, `depth` times, from the
+    newly discovered peers. Each API port of each candidate is probed
+    concurrently; peers are ranked by mean measured round-trip time, then
+    by number of available ports, and stored in `config.peers` with only
+    ports that answered. If no peer could be measured, `config.peers` is
+    kept as is and returned.
 
+    ```python
+    >>> from mainsail import rest
+    >>> rest.use_network("http://49.13.30.19:4003")
+    >>> peers = rest.crawl_peers("http://49.13.30.19:4003", depth=2)
+    >>> peers[0]
+    {'ip': '...', 'ports': {'api-http': 4003, ...}, 'latency': 21}
+    ```
+
+    Args:
+        seed (str): peer url to start from.
+        depth (int): number of discovery hops after the seed.
+        ports (list): port names to probe, default to API ports used by
+            root endpoints.
+        max_peers (int): maximum number of candidates.
+        timeout (float): discovery and probe timeout in seconds.
+        window (int): maximum concurrent calls.
+
+    Returns:
+        list: ranked peers.
+    """
+    ports = set(ports or API_PORTS)
+    candidates, visited, frontier = {}, set(), [seed]
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, window), thread_name_prefix="mainsail-crawl"
+    )
+    # crawled peers are called through a short-lived session so that they
+    # do not add a pooled session each to SESSIONS
+    session = requests.Session()
+    try:
+        for _ in range(depth + 1):
+            futures = [
+                executor.submit(
+                    _get_data, urlparse(url), "api/peers", timeout=timeout,
+                    session=session
+                ) for url in frontier if url not in visited
+            ]
+            visited.update(frontier)
+            frontier = []
+            for future in futures:
+                try:
+                    peers = future.result()
+                except Exception:
+                    continue
+                for peer in peers:
+                    if peer["ip"] in candidates or \
+                       len(candidates) >= max_peers:
+                        continue
+                    peer_ports = candidates[peer["ip"]] = dict(
+                        [k.split("/")[-1], v]
+                        for k, v in peer.get("ports", {}).items() if v > 0
+                    )
+                    # peer api is used for next discovery hop
+                    for name in GET.ports:
+                        if name in peer_ports:
+                            frontier.append(
+                                f"http://{peer['ip']}:{peer_ports[name]}"
+                            )
+                            break
+        probes = dict(
+            (
+                executor.submit(_probe, ip, port, timeout, session),
+                (ip, name, port)
+            )
+            for ip, peer_ports in candidates.items()
+            for name, port in peer_ports.items() if name in ports
+        )
+        measures = {}
+        for future, (ip, name, port) in probes.items():
+            rtt = future.result()
+            if rtt is not None:
+                measures.setdefault(ip, {})[name] = (port, rtt)
+    finally:
+        executor.shutdown(wait=False)
+        session.close()
+
+    peers = sorted(
+        [
+            {
+                "ip": ip,
+                "ports": dict([n, p] for n, (p, _) in available.items()),
+                "latency": round(
+                    sum(rtt for _, rtt in available.values()) /
+                    len(available)
+                )
+            }
+            for ip, available in measures.items()
+        ],
+        key=lambda p: (p["latency"], -len(p["ports"]))
+    )
+    # a short outage or filtered ports must not wipe a working peer list
+    if not peers:
+        LOGGER.warning(f"no peer measured from {seed}, peer list kept")
+        return getattr(config, "peers", [])
+    config._set("peers", peers)
+    config._set(
+        "updated", dict(getattr(config, "updated", {}), peers=time.time())
+    )
+    return peers
+
+
+def staleness(name: str) -> float:
+    """
+    Return the number of seconds since network data `name` (`fees` or
+    `peers`) was fetched, infinity if unknown.
+    """
+    updated = getattr(config, "updated", {}).get(name, None)
+    return float("inf") if updated is None else time.time() - updated
+
+
+class NetworkRefresher(object):
+    """
+    Background thread refreshing network fees and peers every `interval`
+    seconds. Current `config` is updated in place if it holds the refreshed
+    network and stored network snapshot is updated so `load_network` also
+    gets fresh data. Failed refreshes, or refreshes from a peer running
+    another network, are logged and keep previous data.
+
+    ```python
+    >>> from mainsail import rest
+    >>> rest.use_network("http://49.13.30.19:4003")
+    >>> refresher = rest.NetworkRefresher("http://49.13.30.19:4003", 120)
+    >>> refresher.start()
+    >>> rest.staleness("fees")
+    12.52...
+    >>> refresher.stop()
+    ```
+
+    Args:
+        peer (str): peer url to fetch data from.
+        interval (float): refresh period in seconds.
+        nethash (str): network to be refreshed, default to current one.
+        latency (int): maximum latency of peers in ms.
+    """
+
+    def __init__(
+        self, peer: str, interval: float = 300., nethash: str = None,
+        latency: int = 500
+    ) -> None:
+        self.peer = peer
+        self.interval = interval
+        self.latency = latency
+        self.nethash = nethash or getattr(config, "nethash", None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self) -> bool:
+        "Fetch fees and peers concurrently and store them."
+        base_url = urlparse(self.peer)
+        configuration = SESSIONS.executor.submit(
+            _get_data, base_url, "api/node/configuration"
+        )
+        fees = SESSIONS.executor.submit(
+            _get_data, base_url, "api/node/fees", "days=30"
+        )
+        peers = SESSIONS.executor.submit(fetch_peers, self.peer, self.latency)
+        try:
+            nethash = configuration.result().get("nethash", None)
+            fees, peers = fees.result(), peers.result()
+        except Exception as error:
+            LOGGER.warning(f"network refresh from {self.peer} failed: {error}")
+            return False
+        if self.nethash is not None and nethash != self.nethash:
+            LOGGER.warning(
+                f"network refresh from {self.peer} skipped: "
+                f"{nethash} is not {self.nethash}"
+            )
+            return False
+        now = time.time()
+        if getattr(config, "nethash", None) == self.nethash:
+            config._set("fees", fees)
+            config._set("peers", peers)
+            config._set(
+                "updated", dict(
+                    getattr(config, "updated", {}), fees=now, peers=now
+                )
+            )
+        if self.nethash is not None:
+            config._update(
+                self.nethash, fees=fees, peers=peers,
+                updated={"fees": now, "peers": now}
+            )
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            # an unexpected error must not end the refresh thread
+            try:
+                self.refresh()
+            except Exception as error:
+                LOGGER.exception(
+                    f"network refresh from {self.peer} failed: {error}"
+                )
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="mainsail-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# keep-alive sessions shared by all endpoints
+SESSIONS = SessionPool()
+# peer selection shared by all endpoints
+SCHEDULER = PeerScheduler()
+# response cache shared by endpoints defined with a `ttl` option
+CACHE = ResponseCache()
+# in-flight GET calls shared by all endpoints
+FLIGHTS = SingleFlight()
+# endpoint call instrumentation, disabled by default
+METRICS = Metrics()
+# request rate and concurrency per peer shared by all endpoints
+LIMITER = PeerLimiter()
+# ETag and Last-Modified validators of GET responses per url
+VALIDATORS = ValidatorCache()
+# wallet identities shared by resolve_wallets
+RESOLVER = WalletResolver()
 # api root endpoints
 GET = EndPoint(ports=["api-http", "api-development", "core-api"])
 # transaction pool root endpoint
@@ -185,3 +1742,14 @@ POST = EndPoint(ports=["api-transaction-pool", "core-api"], func=requests.post)
 WHK = EndPoint(ports=["api-webhook", "core-webhooks"])
 WHKP = EndPoint(ports=["api-webhook", "core-webhooks"], func=requests.post)
 WHKD = EndPoint(ports=["api-webhook", "core-webhooks"], func=requests.delete)
+# hedged api root endpoint: a second peer is asked if the first one does not
+# answer within the 95th percentile of measured latencies
+HGET = EndPoint(ports=["api-http", "api-development", "core-api"], hedge=95)
+# cached api root endpoint for data barely changing: responses are served
+# from memory for a minute
+CGET = EndPoint(ports=["api-http", "api-development", "core-api"], ttl=60)
+# awaitable api and transaction pool root endpoints
+AGET = AsyncEndPoint(ports=["api-http", "api-development", "core-api"])
+APOST = AsyncEndPoint(
+    ports=["api-transaction-pool", "core-api"], func=requests.post
+)
@@ -1,65 +1,57 @@
 # -*- coding: utf-8 -*-
 
-import base58
 import binascii
-from io import BytesIO
-from mainsail import pack, pack_bytes
+from mainsail import UINT8, AMOUNT_EXPIRATION, ADDRESSES, get_struct
 
 
-def _1_0(cls) -> str:
-    buf = BytesIO()
-    pack("<QI", buf, (cls.amount, cls.expiration))
-    pack_bytes(buf, base58.b58decode_check(cls.recipientId))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+def _1_0(cls, buf: bytearray) -> None:
+    buf += AMOUNT_EXPIRATION.pack(cls.amount, cls.expiration)
+    buf += ADDRESSES.decode(cls.recipientId)
 
 
-def _1_2(cls) -> str:
-    buf = BytesIO()
-    pack_bytes(buf, binascii.unhexlify(cls.asset["validatorPublicKey"]))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+def _1_2(cls, buf: bytearray) -> None:
+    buf += binascii.unhexlify(cls.asset["validatorPublicKey"])
 
 
-def _1_3(cls) -> str:
-    buf = BytesIO()
-    pack("<B", buf, (len(cls.asset["votes"]), ))
-    pack_bytes(buf, binascii.unhexlify("".join(cls.asset["votes"])))
-    pack("<B", buf, (len(cls.asset["unvotes"]), ))
-    pack_bytes(buf, binascii.unhexlify("".join(cls.asset["unvotes"])))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+def _1_3(cls, buf: bytearray) -> None:
+    buf += UINT8.pack(len(cls.asset["votes"]))
+    buf += binascii.unhexlify("".join(cls.asset["votes"]))
+    buf += UINT8.pack(len(cls.asset["unvotes"]))
+    buf += binascii.unhexlify("".join(cls.asset["unvotes"]))
 
 
-def _1_4(cls) -> str:
-    buf = BytesIO()
-    pack(
-        "<BB", buf, (
-            cls.asset["multiSignature"]["min"],
-            len(cls.asset["multiSignature"]["publicKeys"]),
-        )
+def _1_4(cls, buf: bytearray) -> None:
+    buf += UINT8.pack(cls.asset["multiSignature"]["min"])
+    buf += UINT8.pack(len(cls.asset["multiSignature"]["publicKeys"]))
+    buf += binascii.unhexlify(
+        "".join(cls.asset["multiSignature"]["publicKeys"])
     )
-    for puk in cls.asset["multiSignature"]["publicKeys"]:
-        pack_bytes(buf, binascii.unhexlify(puk))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
 
 
-def _1_6(cls) -> str:
-    buf = BytesIO()
-    pack("<H", buf, (len(cls.asset["payments"]), ))
+def _1_6(cls, buf: bytearray) -> None:
+    # payment count, amounts and recipients are packed in a single call,
+    # recipients already decoded by `addPayments` are not decoded again
+    recipients = getattr(cls, "_recipients", {})
+    values = []
     for item in cls.asset["payments"]:
-        pack("<Q", buf, (item["amount"], ))
-        pack_bytes(buf, base58.b58decode_check(item["recipientId"]))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+        values.append(item["amount"])
+        values.append(
+            recipients.get(item["recipientId"], None) or
+            ADDRESSES.decode(item["recipientId"])
+        )
+    n = len(values) // 2
+    buf += get_struct("<H" + "Q21s" * n).pack(n, *values)
 
 
-def _1_7(cls) -> str:
-    return ""
+def _1_7(cls, buf: bytearray) -> None:
+    pass
 
 
-def _1_8(cls) -> str:
-    buf = BytesIO()
-    pack("<B", buf, (len(cls.asset["username"]), ))
-    pack_bytes(buf, cls.asset["username"].encode("utf-8"))
-    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+def _1_8(cls, buf: bytearray) -> None:
+    username = cls.asset["username"].encode("utf-8")
+    buf += UINT8.pack(len(username))
+    buf += username
 
 
-def _1_9(cls) -> str:
-    return ""
+def _1_9(cls, buf: bytearray) -> None:
+    pass
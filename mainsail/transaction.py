@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+import copy
 import binascii
+import functools
+import multiprocessing
+import concurrent.futures
 
-from io import BytesIO
-from typing import Union, TextIO
-from mainsail import config, serializer, deserializer, identity, rest
-from mainsail import pack, pack_bytes, unpack, unpack_bytes, XTOSHI
+from typing import Union, List
+from mainsail import config, serializer, deserializer, identity, rest, nonces
+from mainsail import HEADER, XTOSHI
 
 # bit masks for serialization options
 SKIP_SIG1 = 0b100  # skip signature mask.
@@ -19,6 +24,8 @@ TX_ATTRIBUTES = [
     "signSignature", "nonce", "type", "typeGroup", "vendorField",
     "version", "lockTransactionId", "lockSecret", "expiration"
 ]
+# attributes invalidating memoized serializations when set
+SERIAL_ATTRIBUTES = set(TX_ATTRIBUTES) | set(["_fee", "_senderPublicKey"])
 
 
 class Transaction:
@@ -45,10 +52,36 @@ class Transaction:
     lockSecret: str = None
     expiration: int = 0
 
+    def __setattr__(self, attr: str, value) -> None:
+        # any serialized field update drops memoized serializations
+        if attr in SERIAL_ATTRIBUTES:
+            self.__dict__.pop("_memo", None)
+        object.__setattr__(self, attr, value)
+
+    def _memoized(self) -> dict:
+        # return the serialization memo, dropping it if asset, signatures or
+        # network version were changed in place since it was filled
+        memo = self.__dict__.get("_memo", None)
+        if memo is None or memo["state"] != (
+            self.asset, self.signatures, getattr(config, "version", None)
+        ):
+            memo = self.__dict__["_memo"] = {
+                "state": (
+                    copy.deepcopy(self.asset), copy.copy(self.signatures),
+                    getattr(config, "version", None)
+                ),
+                "bytes": {}, "hex": {}, "id": None
+            }
+        return memo
+
     @property
     def id(self):
-        return \
-            identity.cSecp256k1.hash_sha256(self.serialize()).decode("utf-8")
+        memo = self._memoized()
+        if memo["id"] is None:
+            memo["id"] = identity.cSecp256k1.hash_sha256(
+                self.to_bytes()
+            ).decode("utf-8")
+        return memo["id"]
 
     @property
     def vendorFieldHex(self):
@@ -86,17 +119,20 @@ class Transaction:
     @property
     def senderId(self) -> str:
         # no senderId attributes in Transaction
-        return identity.getWallet(self.senderPublicKey)
+        return identity.get_wallet(self.senderPublicKey)
 
     @senderId.setter
     def senderId(self, addr) -> None:
         # get wallet attributes ans store it as `wallet` attribute
         resp = rest.GET.api.wallets(addr)
-        if not resp.get("error", False):
-            self._wallet = resp
-            # update transaction senderPublicKey and nonce
-            self._senderPublicKey = resp["publicKey"]
-            self.nonce = int(resp["nonce"]) + 1
+        wallet = rest.WalletResolver.unwrap(resp)
+        if wallet is not None:
+            self._wallet = wallet
+            # sync nonce provider and update transaction senderPublicKey and
+            # nonce
+            nonces.PROVIDER.update(wallet)
+            self._senderPublicKey = wallet["publicKey"]
+            self._reserveNonce(wallet["publicKey"])
         else:
             raise rest.ApiError(resp)
 
@@ -106,15 +142,39 @@ class Transaction:
 
     @senderPublicKey.setter
     def senderPublicKey(self, puk) -> None:
-        # get wallet attributes ans store it as `wallet` attribute
-        resp = rest.GET.api.wallets(puk)
-        if not resp.get("error", False):
-            self._wallet = resp
-            self.nonce = int(resp["nonce"]) + 1
-        else:
-            self.nonce = 1
+        # nonce provider syncs once per sender and then computes next nonce
+        # locally, wallet attributes are fetched only when needed
+        self._wallet = None
+        self._reserveNonce(puk)
         self._senderPublicKey = puk
 
+    def _reserveNonce(self, puk: str, nonce: int = None) -> None:
+        # a nonce is reserved once per sender so that signing again the same
+        # transaction keeps it
+        reserved = getattr(self, "_reserved", None)
+        if nonce is not None:
+            nonces.PROVIDER.commit(puk, nonce)
+            self._reserved = (puk, nonce)
+        elif reserved is None or reserved[0] != puk:
+            self._reserved = (puk, nonces.PROVIDER.reserve(puk))
+        self.nonce = self._reserved[1]
+
+    def _senderWallet(self) -> dict:
+        """
+        Return sender wallet, fetched on first call after sender is set.
+        Wallet attributes (vote, multisignature) change with transactions so
+        they are never read from nonce provider state.
+        """
+        wallet = getattr(self, "_wallet", None)
+        if wallet is None:
+            try:
+                wallet = nonces.PROVIDER.fetch(self.senderPublicKey)
+            except Exception:
+                # offline: no attributes known
+                wallet = {}
+            self._wallet = wallet
+        return wallet
+
     def export(self) -> dict:
         """Return a mapping representation of the transaction."""
         result = {}
@@ -136,64 +196,134 @@ class Transaction:
         Returns:
             str: the serialized transaction as hexadecimal string.
         """
-        return self.serializeCommon() + self.serializeAsset() + \
-            self.serializeSignatures(skip_mask)
+        memo = self._memoized()
+        serial = memo["hex"].get(skip_mask, None)
+        if serial is None:
+            serial = memo["hex"][skip_mask] = \
+                binascii.hexlify(self.to_bytes(skip_mask)).decode("utf-8")
+        return serial
+
+    def to_bytes(self, skip_mask: int = 0b000) -> bytes:
+        """
+        Serialize the transaction as raw bytes. Header, asset and signatures
+        are written into a single buffer, no hexadecimal conversion involved.
+        Result is memoized until a transaction field is modified.
 
-    def serializeCommon(self) -> str:
-        buf = BytesIO()
+        Arguments:
+            skip_mask (int): binary mask to skip signatures during the
+                serialization. Available masks are `SKIP_SIG1`, `SIG_SIG2` and
+                `SIG_MSIG`.
 
-        pack("<BBB", buf, (0xff, self.version, config.version))
-        pack("<IHQ", buf, (self.typeGroup, self.type, self.nonce))
-        pack_bytes(buf, binascii.unhexlify(self.senderPublicKey))
+        Returns:
+            bytes: the serialized transaction.
+        """
+        memo = self._memoized()
+        serial = memo["bytes"].get(skip_mask, None)
+        if serial is None:
+            buf = self._packCommon()
+            getattr(serializer, f"_{self.typeGroup}_{self.type}")(self, buf)
+            self._packSignatures(buf, skip_mask)
+            serial = memo["bytes"][skip_mask] = bytes(buf)
+        return serial
 
+    def serializeCommon(self) -> str:
+        return binascii.hexlify(self._packCommon()).decode("utf-8")
+
+    def _packCommon(self) -> bytearray:
         vf_len = getattr(config, "constants", {}).get("vendorFieldLength", 255)
         vendorField = (self.vendorField or "")[:vf_len]
         if isinstance(vendorField, str):
             vendorField = vendorField.encode("utf-8")
-        pack("<QB", buf, (self.fee, len(vendorField)))
-        pack_bytes(buf, vendorField)
-
-        return binascii.hexlify(buf.getvalue()).decode("utf-8")
+        # fixed size header is preallocated and packed in place
+        buf = bytearray(HEADER.size)
+        HEADER.pack_into(
+            buf, 0, 0xff, self.version, config.version, self.typeGroup,
+            self.type, self.nonce, binascii.unhexlify(self.senderPublicKey),
+            self.fee, len(vendorField)
+        )
+        buf += vendorField
+        return buf
 
     @staticmethod
-    def deserializeCommon(buf: TextIO) -> dict:
-        data = {}
-        _, data["version"], _ = unpack("<BBB", buf)
-        data["typeGroup"], data["type"], data["nonce"] = unpack("<IHQ", buf)
-        data["senderPublicKey"] = \
-            binascii.hexlify(unpack_bytes(buf, 33)).decode("utf-8")
-        data["fee"], len_vf = unpack("<QB", buf)
-        vendorField = unpack_bytes(buf, len_vf)
-        try:
-            data["vendorField"] = \
-                binascii.unhexlify(vendorField).decode("utf-8")
-        except binascii.Error:
-            data["vendorField"] = vendorField.decode("utf-8")
-        return data
+    def deserializeCommon(data: memoryview, offset: int = 0) -> tuple:
+        """
+        Decode transaction header from a bytes-like object.
+
+        Arguments:
+            data (memoryview): buffer containing the serialized transaction.
+            offset (int): position of the transaction in the buffer.
+
+        Returns:
+            tuple: header fields as dict and offset of the asset.
+        """
+        (
+            _, version, _, typeGroup, type, nonce, senderPublicKey, fee,
+            len_vf
+        ) = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        vendorField = str(data[offset:offset + len_vf], "utf-8")
+        return {
+            "version": version, "typeGroup": typeGroup, "type": type,
+            "nonce": nonce, "senderPublicKey": senderPublicKey.hex(),
+            "fee": fee, "vendorField": vendorField or None
+        }, offset + len_vf
 
     def serializeAsset(self) -> str:
-        return getattr(serializer, f"_{self.typeGroup}_{self.type}")(self)
+        buf = bytearray()
+        getattr(serializer, f"_{self.typeGroup}_{self.type}")(self, buf)
+        return binascii.hexlify(buf).decode("utf-8")
 
-    def deserializeAsset(self, buf: TextIO):
+    def deserializeAsset(self, data: memoryview, offset: int) -> int:
         return getattr(
             deserializer, f"_{self.typeGroup}_{self.type}"
-        )(self,)
+        )(self, data, offset)
 
     def serializeSignatures(self, skip_mask: int) -> str:
-        buf = BytesIO()
+        buf = bytearray()
+        self._packSignatures(buf, skip_mask)
+        return binascii.hexlify(buf).decode("utf-8")
+
+    def _packSignatures(self, buf: bytearray, skip_mask: int) -> None:
         if not (skip_mask & SKIP_SIG1) and self.signature:
-            pack_bytes(buf, binascii.unhexlify(self.signature))
+            buf += binascii.unhexlify(self.signature)
         if not skip_mask & SKIP_SIG2:
             if self.signSignature:
-                pack_bytes(buf, binascii.unhexlify(self.signSignature))
+                buf += binascii.unhexlify(self.signSignature)
             elif self.secondSignature:
-                pack_bytes(buf, binascii.unhexlify(self.secondSignature))
+                buf += binascii.unhexlify(self.secondSignature)
         if not (skip_mask & SKIP_MSIG) and self.signatures:
-            pack_bytes(buf, binascii.unhexlify("".join(self.signatures)))
-        return binascii.hexlify(buf.getvalue()).decode("utf-8")
+            buf += binascii.unhexlify("".join(self.signatures))
+
+    def deserializeSignatures(
+        self, data: memoryview, offset: int, end: int = None
+    ) -> int:
+        """
+        Decode signatures found between `offset` and `end`. If `end` is not
+        given, transaction is expected to hold a single signature.
+
+        Returns:
+            int: offset of the first byte following the signatures.
+        """
+        if end is None:
+            end = offset + 64
 
-    def deserializeSignatures(self, buf: TextIO):
-        pass  # TODO:
+        def _single(remainder: int) -> bool:
+            return remainder > 0 and (
+                remainder % 64 == 0 or remainder % 65 != 0
+            )
+
+        if _single(end - offset):
+            self.signature = data[offset:offset + 64].hex()
+            offset += 64
+        if _single(end - offset):
+            self.secondSignature = data[offset:offset + 64].hex()
+            offset += 64
+        if end - offset > 0 and (end - offset) % 65 == 0:
+            self.signatures = [
+                data[i:i + 65].hex() for i in range(offset, end, 65)
+            ]
+            offset = end
+        return offset
 
     def sign(
         self, prk: Union[identity.KeyRing, str, int] = None,
@@ -203,16 +333,14 @@ class Transaction:
             prk = identity.KeyRing.create(prk)
         self.senderPublicKey = prk.puk().encode()
         if nonce:
-            self.nonce = nonce
-        self.signature = prk.sign(
-            binascii.unhexlify(self.serialize(SKIP_SIG1 | SKIP_SIG2))
-        ).raw()
+            self._reserveNonce(self.senderPublicKey, nonce)
+        self.signature = prk.sign(self.to_bytes(SKIP_SIG1 | SKIP_SIG2)).raw()
 
     def signSign(
         self, prk2: Union[identity.KeyRing, str, int] = None
     ) -> None:
         self.secondSignature = identity.sign(
-            binascii.unhexlify(self.serialize(SKIP_SIG2)), prk2, "raw"
+            self.to_bytes(SKIP_SIG2), prk2, "raw"
         )
 
     def multiSign(
@@ -221,9 +349,7 @@ class Transaction:
         if not isinstance(prki, identity.KeyRing):
             prki = identity.KeyRing.create(prki)
         sig = prki.sign(
-            binascii.unhexlify(
-                self.serialize(SKIP_SIG1 | SKIP_SIG2 | SKIP_MSIG)
-            )
+            self.to_bytes(SKIP_SIG1 | SKIP_SIG2 | SKIP_MSIG)
         ).raw()
         return self.appendMultiSig(sig, prki.puk().encode())
 
@@ -231,14 +357,12 @@ class Transaction:
         krg_cls = \
             identity.Schnorr if getattr(identity.config, "bip340", False) \
             else identity.Bcrpt410
-        msg = binascii.unhexlify(
-            self.serialize(SKIP_SIG1 | SKIP_SIG2 | SKIP_MSIG)
-        )
+        msg = self.to_bytes(SKIP_SIG1 | SKIP_SIG2 | SKIP_MSIG)
         check = False
 
         puki = (
             getattr(self, "asset", {}) if self.type == 4 else
-            getattr(self, "_wallet", {}).get("attributes", {})
+            self._senderWallet().get("attributes", {})
         ).get("multiSignature", {}).get("publicKeys", [])
 
         if puk is None:
@@ -260,4 +384,162 @@ class Transaction:
         return check
 
     def send(self) -> dict:
-        return rest.POST.api.transactions(transactions=[self.serialize()])
+        resp = rest.POST.api.transactions(transactions=[self.serialize()])
+        # rejected transaction: sender nonce has to be synced again
+        if isinstance(resp, dict) and \
+           len(resp.get("data", {}).get("invalid", [])):
+            nonces.PROVIDER.resync(self.senderPublicKey)
+        return resp
+
+
+class TransactionRecord:
+    """
+    Compact transaction storage using `__slots__`, without REST bound
+    properties, wallet data nor memoization. It serializes and exports the
+    same way `Transaction` does and is meant to hold large amounts of
+    decoded or baked transactions.
+    """
+    __slots__ = tuple(attr for attr in TX_ATTRIBUTES if attr != "id")
+
+    _packCommon = Transaction._packCommon
+    _packSignatures = Transaction._packSignatures
+    serializeCommon = Transaction.serializeCommon
+    serializeAsset = Transaction.serializeAsset
+    serializeSignatures = Transaction.serializeSignatures
+    deserializeAsset = Transaction.deserializeAsset
+    deserializeSignatures = Transaction.deserializeSignatures
+    export = Transaction.export
+    send = Transaction.send
+
+    def __init__(self, **fields) -> None:
+        for attr in TransactionRecord.__slots__:
+            # use Transaction class defaults, skipping properties
+            default = vars(Transaction).get(attr, None)
+            if isinstance(default, property):
+                default = None
+            setattr(self, attr, fields.get(attr, default))
+        # sender and vendorField are mostly shared by records of a batch
+        for attr in ["senderPublicKey", "vendorField"]:
+            value = getattr(self, attr)
+            if isinstance(value, str):
+                setattr(self, attr, sys.intern(value))
+
+    @staticmethod
+    def from_transaction(tx: Transaction):
+        "Build a record from a transaction."
+        return TransactionRecord(**tx.export())
+
+    @property
+    def id(self) -> str:
+        return \
+            identity.cSecp256k1.hash_sha256(self.to_bytes()).decode("utf-8")
+
+    def to_bytes(self, skip_mask: int = 0b000) -> bytes:
+        buf = self._packCommon()
+        getattr(serializer, f"_{self.typeGroup}_{self.type}")(self, buf)
+        self._packSignatures(buf, skip_mask)
+        return bytes(buf)
+
+    def serialize(self, skip_mask: int = 0b000) -> str:
+        return binascii.hexlify(self.to_bytes(skip_mask)).decode("utf-8")
+
+
+def _sign(secret: int, bip340: bool, message: bytes) -> str:
+    # process pool worker: nonce is derived from message and secret
+    # (rfc6979) so signatures do not depend on where they are computed
+    if bip340:
+        return identity.Schnorr(secret).sign(message, rfc6979=True).raw()
+    return identity.Bcrpt410(secret).sign(message).raw()
+
+
+def sign_batch(
+    transactions: List[Transaction],
+    keyring: Union[identity.KeyRing, str, int] = None,
+    start_nonce: int = None, processes: int = None, threshold: int = 64
+) -> List[Transaction]:
+    """
+    Sign a list of transactions issued by a single sender. Public key is
+    derived once, consecutive nonces are assigned in list order and, for
+    large batches, signatures are computed over a process pool.
+
+    Args:
+        transactions (List[Transaction]): transactions to sign.
+        keyring (KeyRing|str|int): sender private key or secret.
+        start_nonce (int): nonce of the first transaction. If not given,
+            nonces are reserved from `nonces.PROVIDER`.
+        processes (int): process pool size, default to cpu count.
+        threshold (int): minimum batch size to use the process pool.
+
+    Returns:
+        List[Transaction]: signed transactions, in the given order.
+    """
+    if not isinstance(keyring, identity.KeyRing):
+        keyring = identity.KeyRing.create(keyring)
+    puk = keyring.puk().encode()
+    # with a given start nonce, sender is not synced with network
+    if start_nonce is None:
+        start_nonce = nonces.PROVIDER.reserve(puk, len(transactions))
+    else:
+        nonces.PROVIDER.commit(puk, start_nonce + len(transactions) - 1)
+
+    wallet = None
+    for i, tx in enumerate(transactions):
+        tx._senderPublicKey = puk
+        tx._wallet = wallet
+        tx._reserved = (puk, start_nonce + i)
+        tx.nonce = start_nonce + i
+        # Vote builder adds the former vote into unvotes, sender wallet is
+        # fetched once for the whole batch
+        if hasattr(tx, "checkAsset"):
+            tx.checkAsset()
+            wallet = tx._wallet
+    messages = [tx.to_bytes(SKIP_SIG1 | SKIP_SIG2) for tx in transactions]
+
+    processes = processes or os.cpu_count() or 1
+    bip340 = isinstance(keyring, identity.Schnorr)
+    if len(messages) < threshold or processes == 1:
+        # same deterministic nonces as process pool workers
+        signatures = [
+            (
+                keyring.sign(message, rfc6979=True) if bip340 else
+                keyring.sign(message)
+            ).raw() for message in messages
+        ]
+    else:
+        worker = functools.partial(_sign, int(keyring), bip340)
+        # workers are spawned, forking a threaded process (pool daemon)
+        # could copy locks held by other threads
+        with concurrent.futures.ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            signatures = list(
+                executor.map(
+                    worker, messages,
+                    chunksize=max(1, len(messages) // (processes * 4))
+                )
+            )
+
+    for tx, signature in zip(transactions, signatures):
+        tx.signature = signature
+    return transactions
+
+
+def verify_batch(
+    transactions: List[Transaction], processes: int = None,
+    threshold: int = 64
+) -> List[bool]:
+    """
+    Check sender signature of many transactions (builders or records) using
+    `identity.verify_batch`.
+
+    Returns:
+        List[bool]: verification results, in the given order.
+    """
+    return identity.verify_batch(
+        [
+            (
+                tx.senderPublicKey, tx.to_bytes(SKIP_SIG1 | SKIP_SIG2),
+                tx.signature
+            ) for tx in transactions
+        ], processes, threshold
+    )
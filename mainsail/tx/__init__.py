@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import os
+import io
 import sys
+import mmap
+import hashlib
 import binascii
 
-from io import BytesIO
-from mainsail import TYPES
-from mainsail.transaction import Transaction
+from typing import Iterator, Union
+from mainsail import TYPES, UINT16, UINT32, UINT64, loadJson
+from mainsail.transaction import Transaction, TransactionRecord
 
 # sort all version modules and import all from the last one
 v_modules = sorted(
@@ -19,12 +22,171 @@ v_modules = sorted(
 exec(f"from mainsail.tx.{v_modules[-1]} import *")
 
 
-def deserialize(serial: str) -> Transaction:
+def _build(
+    data: memoryview, offset: int, end: int = None, record: bool = False
+) -> tuple:
+    # decode the transaction found at `offset` and return it with the offset
+    # of the first byte following it
+    header, offset = Transaction.deserializeCommon(data, offset)
+    if record:
+        tx = TransactionRecord(**header)
+    else:
+        # transform TYPES enum name to class name
+        name = "".join(
+            e.capitalize() for e in TYPES(header["type"]).name.split("_")
+        )
+        # get transaction builder class
+        try:
+            cls = getattr(sys.modules[__name__], name)
+        except AttributeError:
+            raise AttributeError(
+                f"transaction type {TYPES(header['type']).value} builder "
+                "is not defined"
+            )
+        # builder __init__ is skipped so no REST call is issued and fee and
+        # sender public key are set without their setter side effects
+        tx = cls.__new__(cls)
+        tx._fee = header.pop("fee")
+        tx._senderPublicKey = header.pop("senderPublicKey")
+        for key, value in header.items():
+            setattr(tx, key, value)
+    offset = tx.deserializeAsset(data, offset)
+    offset = tx.deserializeSignatures(data, offset, end)
+    return tx, offset
+
+
+class TransactionView:
+    """
+    Read-only transaction over a serialized buffer. Header fields are read
+    at their fixed offset when asked, asset and signatures are decoded on
+    first access only. It is meant to scan large amounts of transactions
+    (block or pool dumps) and convert only the selected ones.
+
+    Args:
+        data (bytes|memoryview): the serialized transaction.
+        record (TransactionRecord): already decoded transaction if any.
+    """
+    __slots__ = ("data", "_record")
+
+    def __init__(
+        self, data: Union[bytes, memoryview], record: TransactionRecord = None
+    ) -> None:
+        self.data = memoryview(data)
+        self._record = record
+
+    def _decoded(self) -> TransactionRecord:
+        if self._record is None:
+            self._record = _build(self.data, 0, len(self.data), True)[0]
+        return self._record
+
+    @property
+    def version(self) -> int:
+        return self.data[1]
+
+    @property
+    def network(self) -> int:
+        return self.data[2]
+
+    @property
+    def typeGroup(self) -> int:
+        return UINT32.unpack_from(self.data, 3)[0]
+
+    @property
+    def type(self) -> int:
+        return UINT16.unpack_from(self.data, 7)[0]
+
+    @property
+    def nonce(self) -> int:
+        return UINT64.unpack_from(self.data, 9)[0]
+
+    @property
+    def senderPublicKey(self) -> str:
+        return self.data[17:50].hex()
+
+    @property
+    def fee(self) -> int:
+        return UINT64.unpack_from(self.data, 50)[0]
+
+    @property
+    def vendorField(self) -> str:
+        return Transaction.deserializeCommon(self.data)[0]["vendorField"]
+
+    @property
+    def amount(self) -> int:
+        return self._decoded().amount
+
+    @property
+    def expiration(self) -> int:
+        return self._decoded().expiration
+
+    @property
+    def recipientId(self) -> str:
+        return self._decoded().recipientId
+
+    @property
+    def asset(self) -> dict:
+        return self._decoded().asset
+
+    @property
+    def signature(self) -> str:
+        return self._decoded().signature
+
+    @property
+    def secondSignature(self) -> str:
+        return self._decoded().secondSignature
+
+    @property
+    def signatures(self) -> list:
+        return self._decoded().signatures
+
+    @property
+    def id(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+    def serialize(self) -> str:
+        return self.data.hex()
+
+    def export(self) -> dict:
+        return self._decoded().export()
+
+    def to_record(self) -> TransactionRecord:
+        "Return the decoded `TransactionRecord`."
+        return self._decoded()
+
+    def to_transaction(self) -> Transaction:
+        "Build the full transaction using the appropriate builder."
+        return _build(self.data, 0, len(self.data))[0]
+
+
+def _walk(
+    data: memoryview, prefixed: bool, record: bool
+) -> Iterator[Transaction]:
+    offset, size = 0, len(data)
+    while offset < size:
+        if prefixed:
+            length, = UINT32.unpack_from(data, offset)
+            offset += UINT32.size
+            tx, _ = _build(data, offset, offset + length, record)
+            offset += length
+        else:
+            tx, offset = _build(data, offset, None, record)
+        yield tx
+
+
+def deserialize(
+    serial: Union[str, bytes], record: bool = False
+) -> Transaction:
     """
     Build a transaction from hexadecimal string.
 
     Args:
-        serial (str): the serialized transaction as hexadecimal string.
+        serial (str|bytes): the serialized transaction as hexadecimal string
+            or raw bytes.
+        record (bool): build a compact `TransactionRecord` instead of a
+            transaction builder.
 
     Returns:
         Transaction: the transaction.
@@ -32,20 +194,111 @@ def deserialize(serial: str) -> Transaction:
     Raises:
         AttributeError: if transaction builder is not defined.
     """
-    buf = BytesIO(binascii.unhexlify(serial))
-    data = Transaction.deserializeCommon(buf)
-    # transform TYPES enum name to class name
-    name = "".join(e.capitalize() for e in TYPES(data["type"]).name.split("_"))
-    # get transaction builder class
-    try:
-        tx = getattr(sys.modules[__name__], name)()
-    except AttributeError:
-        raise AttributeError(
-            f"transaction type {TYPES(data['type']).value} builder "
-            "is not defined"
-        )
-    for key, value in data.items():
-        setattr(tx, key, value)
-    tx.deserializeAsset(buf)
-    tx.deserializeSignatures(buf)
-    return tx
+    if isinstance(serial, str):
+        serial = binascii.unhexlify(serial)
+    data = memoryview(serial)
+    return _build(data, 0, len(data), record)[0]
+
+
+def iter_deserialize(
+    source: Union[str, bytes, list, io.IOBase], prefixed: bool = True,
+    record: bool = False
+) -> Iterator[Transaction]:
+    """
+    Lazily build transactions from a batch of serialized transactions.
+    Buffers are walked in place and files are memory-mapped, so no slice of
+    the source is copied.
+
+    Args:
+        source (str|bytes|list|file): a bytes-like object, a list of
+            serialized transactions (hexadecimal strings or bytes, as found
+            in registry files or API payloads), a binary file object or a
+            path to a binary or JSON registry file.
+        prefixed (bool): binary sources hold transactions prefixed by their
+            length as a little-endian uint32. If `False`, transactions are
+            simply concatenated and each one is expected to hold a single
+            signature.
+        record (bool): build compact `TransactionRecord` objects instead of
+            transaction builders.
+
+    Yields:
+        Transaction: the transactions, in source order.
+
+    Raises:
+        AttributeError: if a transaction builder is not defined.
+    """
+    if isinstance(source, (list, tuple)):
+        for serial in source:
+            yield deserialize(serial, record)
+    elif isinstance(source, str):
+        with io.open(source, "rb") as in_:
+            if in_.read(1) == b"[":
+                yield from iter_deserialize(loadJson(source), record=record)
+            else:
+                in_.seek(0)
+                yield from iter_deserialize(in_, prefixed, record)
+    elif hasattr(source, "fileno"):
+        if os.fstat(source.fileno()).st_size == 0:
+            return
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            with memoryview(m) as data:
+                yield from _walk(data, prefixed, record)
+    else:
+        with memoryview(source) as data:
+            yield from _walk(data, prefixed, record)
+
+
+def iter_views(
+    source: Union[str, bytes, list, io.IOBase], prefixed: bool = True
+) -> Iterator[TransactionView]:
+    """
+    Lazily yield `TransactionView` objects from a batch of serialized
+    transactions. Views share the source buffer, files are memory-mapped.
+    Filtering by header fields costs a few `unpack_from` calls per
+    transaction:
+
+    ```python
+    >>> [v.to_transaction() for v in iter_views(blob) if v.type == 6]
+    ```
+
+    Args:
+        source (str|bytes|list|file): see `iter_deserialize`.
+        prefixed (bool): see `iter_deserialize`. Concatenated transactions
+            have to be decoded to find their end, so their views are built
+            from decoded records.
+
+    Yields:
+        TransactionView: transaction views, in source order.
+    """
+    if isinstance(source, (list, tuple)):
+        for serial in source:
+            yield TransactionView(
+                binascii.unhexlify(serial) if isinstance(serial, str) else
+                serial
+            )
+        return
+    if isinstance(source, str):
+        with io.open(source, "rb") as in_:
+            if in_.read(1) == b"[":
+                yield from iter_views(loadJson(source))
+                return
+            in_.seek(0)
+            yield from iter_views(in_, prefixed)
+            return
+    if hasattr(source, "fileno"):
+        if os.fstat(source.fileno()).st_size == 0:
+            return
+        # map stays open as long as views reference it
+        source = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(source)
+    offset, size = 0, len(data)
+    while offset < size:
+        if prefixed:
+            length, = UINT32.unpack_from(data, offset)
+            offset += UINT32.size
+            yield TransactionView(data[offset:offset + length])
+            offset += length
+        else:
+            record, end = _build(data, offset, None, True)
+            yield TransactionView(data[offset:end], record)
+            offset = end
@@ -4,14 +4,14 @@ This module provides v1 transaction builders.
 """
 
 import re
-import base58
 import getpass
-import binascii
 import cSecp256k1
 
-from typing import Union
+from typing import Union, Sequence
 from mainsail.transaction import Transaction, SKIP_SIG1, SKIP_SIG2
-from mainsail import config, rest, identity, TYPE_GROUPS, TYPES, XTOSHI
+from mainsail import config, rest, identity
+from mainsail import TYPE_GROUPS, TYPES, XTOSHI
+from mainsail import ADDRESSES
 
 __all__ = [
     "Transfer", "ValidatorRegistration", "ValidatorResignation",
@@ -30,7 +30,7 @@ class Transfer(Transaction):
         vendorField: Union[str, bytes] = None
     ) -> None:
         try:
-            base58.b58decode_check(recipientId)
+            ADDRESSES.decode(recipientId)
         except ValueError:
             raise identity.InvalidWalletAddress(
                 f"recipientId '{recipientId}' is not a valid wallet address"
@@ -86,19 +86,29 @@ class Vote(Transaction):
             self.upVote(validator)
 
     def checkAsset(self):
-        prev_puk = getattr(
-            self, "_wallet", {}
-        ).get("attributes", {}).get("vote", None)
-        if prev_puk is not None and len(self.asset["votes"]):
-            self.asset["unvotes"] = [prev_puk]
+        if len(self.asset["votes"]):
+            prev_puk = self._senderWallet().get(
+                "attributes", {}
+            ).get("vote", None)
+            if prev_puk is not None:
+                self.asset["unvotes"] = [prev_puk]
+
+    @staticmethod
+    def _publicKey(validator: str) -> str:
+        # public keys are used as is, no network call needed
+        if re.match("^0[23][0-9a-f]{64}$", validator) is not None:
+            return validator
+        return (rest.resolve_wallets([validator])[validator] or {}).get(
+            "publicKey", None
+        )
 
     def upVote(self, validator: str) -> None:
-        puk = rest.GET.api.wallets(validator).get("publicKey")
+        puk = self._publicKey(validator)
         if puk not in self.asset["votes"]:
             self.asset["votes"] = [puk]
 
     def downVote(self, validator: str) -> None:
-        puk = rest.GET.api.wallets(validator).get("publicKey")
+        puk = self._publicKey(validator)
         self.asset["unvotes"] = [puk]
 
     def sign(
@@ -109,11 +119,9 @@ class Vote(Transaction):
             prk = identity.KeyRing.create(prk)
         self.senderPublicKey = prk.puk().encode()
         if nonce:
-            self.nonce = nonce
+            self._reserveNonce(self.senderPublicKey, nonce)
         self.checkAsset()
-        self.signature = prk.sign(
-            binascii.unhexlify(self.serialize(SKIP_SIG1 | SKIP_SIG2))
-        ).raw()
+        self.signature = prk.sign(self.to_bytes(SKIP_SIG1 | SKIP_SIG2)).raw()
 
 
 class MultiSignature(Transaction):
@@ -172,6 +180,50 @@ class MultiPayment(Transaction):
         )
         self.amount += amount
 
+    def addPayments(
+        self, amounts: Sequence[Union[float, int]], addresses: Sequence[str],
+        xtoshi: bool = False
+    ) -> None:
+        """
+        Add a batch of payments from parallel sequences. Sequence lengths,
+        recipient limit and addresses are checked once before any payment
+        is added.
+
+        Args:
+            amounts (Sequence[float|int]): payment amounts in coin, or in
+                XTOSHI if `xtoshi` is set (an `array.array("Q")` for example).
+            addresses (Sequence[str]): recipient wallet addresses.
+            xtoshi (bool): amounts are already expressed in XTOSHI.
+
+        Raises:
+            ValueError: if sequence lengths differ or if too many payments.
+            identity.InvalidWalletAddress: if an address is not valid.
+        """
+        if len(amounts) != len(addresses):
+            raise ValueError(
+                f"{len(amounts)} amounts given for {len(addresses)} addresses"
+            )
+        limit = getattr(config, "constants", {}).get("multiPaymentLimit", 256)
+        if len(self.asset["payments"]) + len(addresses) > limit:
+            raise ValueError(f"multipayment is limited to {limit} payments")
+        # raw recipients decoded here are reused by asset serialization
+        recipients = dict(getattr(self, "_recipients", {}))
+        for address in addresses:
+            try:
+                recipients[address] = ADDRESSES.decode(address)
+            except ValueError:
+                raise identity.InvalidWalletAddress(
+                    f"recipientId '{address}' is not a valid wallet address"
+                )
+        self._recipients = recipients
+        if not xtoshi:
+            amounts = [int(amount * XTOSHI) for amount in amounts]
+        self.asset["payments"].extend(
+            {"recipientId": address, "amount": int(amount)}
+            for amount, address in zip(amounts, addresses)
+        )
+        self.amount += sum(amounts)
+
 
 class ValidatorResignation(Transaction):
 
@@ -30,12 +30,11 @@ Setup script creates 9 commands into `~/.bash_aliases` file:
 """
 
 import os
-import json
 import queue
 import flask
 import logging
 
-from mainsail import webhook, loadJson, dumpJson
+from mainsail import webhook, codec, loadJson, dumpJson
 from mnsl_pool import tbw, biom
 
 # set basic logging
@@ -44,7 +43,8 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.DEBUG)
 
 CONF_PARAMETERS = {
-    "sleep_time": int
+    "sleep_time": int,
+    "refresh_time": int
 }
 
 
@@ -76,7 +76,7 @@ def configure():
     if biom.check_headers(flask.request.headers):
         if flask.request.method == "POST":
             path = os.path.join(tbw.DATA, ".conf")
-            data = json.loads(flask.request.data).get("data", {})
+            data = codec.loads(flask.request.data).get("data", {})
             conf = dict(
                 loadJson(path), **dict(
                     [k, v] for k, v in data.items() if k in CONF_PARAMETERS
@@ -99,7 +99,7 @@ def pool_configure() -> flask.Response:
     if biom.check_headers(flask.request.headers):
         puk = flask.request.headers["puk"]
         path = os.path.join(tbw.DATA, f"{puk}.json")
-        data = json.loads(flask.request.data)
+        data = codec.loads(flask.request.data)
         # BUGFIX: when used directly on server where pool is runing, the
         # headers seem to be copied into request data...
         data.pop("headers", False)
@@ -146,7 +146,7 @@ def block_forged() -> flask.Response:
         )
         LOGGER.info("webhook check> %s", check)
         if check is True and flask.request.data != b'':
-            data = json.loads(flask.request.data)
+            data = codec.loads(flask.request.data)
             block = data.get("data", {})
             LOGGER.debug("block received> %s", block)
             JOB.put(block)
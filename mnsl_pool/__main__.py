@@ -10,6 +10,16 @@ from mnsl_pool import tbw, biom, loadJson, dumpJson, LOGGER
 
 TASK = queue.Queue()
 SLEEP = threading.Event()
+REFRESHERS = []
+
+
+def _peer_url(peer: dict) -> str:
+    # api peers are stored as rest.Peer dicts
+    if "url" in peer:
+        return peer["url"]
+    port = list(peer.get("ports", {}).values())[:1]
+    return f"http://{peer.get('ip', '127.0.0.1')}" + \
+        (f":{port[0]}" if port else "")
 
 
 def payroll():
@@ -110,11 +120,31 @@ def stop():
     TASK.put(False)
     TASK.get()
     SLEEP.set()
+    for refresher in REFRESHERS:
+        refresher.stop()
 
 
 conf = loadJson(os.path.join(tbw.DATA, ".conf"))
 TASK.put(conf.get("sleep_time", 5*60))
 
+# optional background refresh of network fees and peers, one refresher per
+# network using the api peer of the first validator found on it
+if conf.get("refresh_time", 0) > 0:
+    networks = {}
+    for name in sorted(os.listdir(tbw.DATA)):
+        if name.endswith(".json"):
+            info = loadJson(os.path.join(tbw.DATA, name))
+            if info.get("nethash", None) is not None:
+                networks.setdefault(
+                    info["nethash"],
+                    _peer_url(info.get("api_peer", tbw.PEER))
+                )
+    for nethash, url in networks.items():
+        REFRESHERS.append(
+            rest.NetworkRefresher(url, conf["refresh_time"], nethash)
+        )
+        REFRESHERS[-1].start()
+
 payroll_task = threading.Thread(target=payroll)
 accountant_task = threading.Thread(target=accountant)
 
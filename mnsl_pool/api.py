@@ -16,17 +16,21 @@ LOGGER.setLevel(logging.DEBUG)
 def _find(puk_or_username):
     if os.path.isfile(os.path.join(tbw.DATA, f"{puk_or_username}.json")):
         return puk_or_username
+    # group validators by network so their wallets are resolved at once
+    networks = {}
     for name in [n for n in os.listdir(tbw.DATA) if n.endswith(".json")]:
         try:
-            rest.load_network(
-                loadJson(os.path.join(tbw.DATA, name))["nethash"]
-            )
+            nethash = loadJson(os.path.join(tbw.DATA, name))["nethash"]
         except Exception:
             pass
         else:
-            puk = name.split(".")[0]
-            attributes = rest.GET.api.wallets(puk).get("attributes", {})
-            tbw.LOGGER.debug(f"{name} : {attributes}")
+            networks.setdefault(nethash, []).append(name.split(".")[0])
+    for nethash, puks in networks.items():
+        if not rest.load_network(nethash):
+            continue
+        for puk, wallet in rest.resolve_wallets(puks).items():
+            attributes = (wallet or {}).get("attributes", {})
+            tbw.LOGGER.debug(f"{puk} : {attributes}")
             if puk_or_username == attributes.get("username", ""):
                 return puk
 
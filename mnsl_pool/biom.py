@@ -6,7 +6,6 @@ import re
 import sys
 import math
 import time
-import base58
 import getpass
 import logging
 import datetime
@@ -15,7 +14,7 @@ import requests
 from datetime import timezone
 from urllib import parse
 from mnsl_pool import tbw
-from mainsail import identity, rest, webhook
+from mainsail import identity, rest, webhook, ADDRESSES
 from typing import Union, List
 
 # set basic logging
@@ -112,7 +111,7 @@ def _merge_options(**options):
                 )
         elif key == "wallet":
             try:
-                base58.b58decode_check(value)
+                ADDRESSES.decode(value)
             except Exception:
                 LOGGER.info(f"{value} is not a valid wallet address")
             else:
@@ -126,7 +125,7 @@ def _merge_options(**options):
                 ]
             for address in value:
                 try:
-                    base58.b58decode_check(address)
+                    ADDRESSES.decode(address)
                 except Exception:
                     LOGGER.info(f"{address} is not a valid wallet address")
                 else:
@@ -373,7 +372,12 @@ ba5477ba
             LOGGER.info("%r", error)
             pass
     options["api_peer"] = rest.Peer(api_peer)
-    options["username"] = rest.GET.api.wallets(puk).get("username", None)
+    # username as known by the peer just provided
+    wallet = rest.resolve_wallets(
+        [puk], peer=options["api_peer"]
+    )[puk] or {}
+    options["username"] = wallet.get("username", None) or \
+        wallet.get("attributes", {}).get("username", None)
     # reach a valid subscription node
     webhook_peer = None
     while webhook_peer is None:
@@ -8,8 +8,9 @@ import logging
 import datetime
 import binascii
 
-from mainsail import rest, identity, loadJson, dumpJson, XTOSHI
+from mainsail import rest, identity, nonces, loadJson, dumpJson, XTOSHI
 from mainsail.tx import Transfer, MultiPayment
+from mainsail.transaction import sign_batch
 
 # Set basic logging.
 logging.basicConfig()
@@ -17,6 +18,7 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
 DATA = os.path.join(os.getenv("HOME"), ".mainsail", ".pools")
 PEER = rest.Peer("http://127.0.0.1:4003")
+POOL_PEER = rest.Peer("http://127.0.0.1:4007")
 
 os.makedirs(DATA, exist_ok=True)
 
@@ -53,21 +55,21 @@ def update_forgery(block: dict) -> bool:
     blocks = 1
     reward = int(block["reward"])
     fee = int(block["totalFee"])
-    # get all unparsed blocks till the last forged
-    unparsed_blocks, page, last_height = [], 1, last_block["height"]
-    while page > 0:  # infinite loop
-        resp = rest.GET.api.delegates(
-            publicKey, "blocks", orderBy="height:desc", page=page, limit=100,
-            peer=peer
-        )
-        filtered_blocks = [
-            b for b in resp.get("data", [])
-            if b["height"] > last_height and b["height"] < block["height"]
-        ]
-        unparsed_blocks.extend(filtered_blocks)
-        if len(filtered_blocks) < 100:
-            break  # -> exit infinite loop
-        page += 1  # -> go to next API page
+    # get all unparsed blocks till the last forged, pages are fetched
+    # concurrently so stop as soon as last forged height is reached. Calls
+    # are pinned to the validator api peer to keep a consistent view of the
+    # chain so they are not hedged
+    unparsed_blocks, last_height = {}, last_block["height"]
+    for b in rest.paginate(
+        rest.GET.api.delegates, publicKey, "blocks", orderBy="height:desc",
+        limit=100, peer=peer
+    ):
+        if b["height"] <= last_height:
+            break  # -> exit pagination
+        if b["height"] < block["height"]:
+            # index by id in case of page shift while fetching
+            unparsed_blocks[b["id"]] = b
+    unparsed_blocks = list(unparsed_blocks.values())
     # extract fees and rewards from unparsed blocks
     LOGGER.debug(f"---- found {len(unparsed_blocks)} unparsed blocks")
     blocks += len(unparsed_blocks)
@@ -87,18 +89,12 @@ def update_forgery(block: dict) -> bool:
     generator_reward = reward - shared_reward
 
     # 3. GET VOTER WEIGHTS
-    voters, page = {}, 1
-    while page > 0:  # infinite loop
-        resp = rest.GET.api.delegates(
-            publicKey, "voters", page=page, peer=peer
-        )
-        voters.update(
-            (v["address"], int(v["balance"])) for v in resp.get("data", [])
-            if filter_addr(v["address"])  # not in excludes
-        )
-        if resp.get("meta", {}).get("next", None) is None:
-            break  # -> exit infinite loop
-        page += 1  # -> go to next API page
+    voters = dict(
+        (v["address"], int(v["balance"])) for v in rest.paginate(
+            rest.GET.api.delegates, publicKey, "voters", limit=100,
+            peer=peer
+        ) if filter_addr(v["address"])  # not in excludes
+    )
     # filter all voters using minimum and maximum votes
     voters = dict(
         [a, min(max_vote, b)] for a, b in voters.items() if b >= min_vote
@@ -209,11 +205,12 @@ def bake_registry(puk: str) -> None:
     if len(names):
         prk = identity.KeyRing.load(info.get("prk", None))
         rest.load_network(info["nethash"])
-        wallet = rest.GET.api.wallets(puk)
-        nonce = int(wallet.get("nonce", 0)) + 1
+        # sync sender once per payroll, nonces are then reserved locally
+        nonces.PROVIDER.resync(puk)
+        wallet = nonces.PROVIDER.wallet(puk)
         for name in names:
             LOGGER.info(f"baking registry for {name} frozen forgery...")
-            registry = []
+            transactions = []
             tbw = loadJson(os.path.join(DATA, puk, f"{name}.forgery"))
             share = Transfer(
                 0,  # set 0 to ammount to use tbw["validator-share"] directly
@@ -221,8 +218,7 @@ def bake_registry(puk: str) -> None:
                 f"\U0001f4b3 {wallet.get('username', puk)} reward"
             )
             share.amount = tbw["validator-share"]
-            share.sign(prk, nonce=nonce)
-            registry.append(share.serialize())
+            transactions.append(share)
 
             message = info.get(
                 "message", f"\U0001f4b3 {wallet.get('username', puk)} share"
@@ -230,23 +226,20 @@ def bake_registry(puk: str) -> None:
             voter_shares = tbw.get("voter-shares", {})
             if len(voter_shares) <= 2:
                 for address, amount in voter_shares.items():
-                    nonce += 1
                     transfer = Transfer(0, address, message)  # 0 to use amount
                     transfer.amount = amount
-                    transfer.sign(prk, nonce=nonce)
-                    registry.append(transfer.serialize())
+                    transactions.append(transfer)
             else:
                 chunck_size = info.get("chunck_size", 50)
                 items = list(voter_shares.items())
                 for i in list(range(len(items)))[::chunck_size]:
-                    nonce += 1
                     multipayment = MultiPayment(vendorField=message)
-                    multipayment.asset["payments"].extend([
-                        {"recipientId": address, "amount": amount}
-                        for address, amount in items[i:i + chunck_size]
-                    ])
-                    multipayment.sign(prk, nonce=nonce)
-                    registry.append(multipayment.serialize())
+                    addresses, amounts = zip(*items[i:i + chunck_size])
+                    multipayment.addPayments(amounts, addresses, xtoshi=True)
+                    transactions.append(multipayment)
+            # consecutive nonces are assigned and signatures computed at once
+            sign_batch(transactions, prk)
+            registry = [tx.serialize() for tx in transactions]
             dumpJson(registry, os.path.join(DATA, puk, f"{name}.registry"))
             try:
                 dumpJson(
@@ -260,17 +253,22 @@ def bake_registry(puk: str) -> None:
 
 
 def broadcast_registry(puk: str) -> None:
+    # validator network is read from its snapshot: shared configuration may
+    # be switched to another network by a concurrent task
+    info = loadJson(os.path.join(DATA, f"{puk}.json"))
+    network = rest.config._read(info.get("nethash", None))
     for registry in [
         reg for reg in os.listdir(os.path.join(DATA, puk))
         if reg.endswith(".registry")
     ]:
         tx = loadJson(os.path.join(DATA, puk, registry))
-        LOGGER.info(
-            rest.POST.api.transactions(
-                transactions=tx,
-                peer=rest.Peer("http://127.0.0.1:4007")
+        # local transaction pool and best network peers
+        LOGGER.info(rest.broadcast(
+            tx, peers=[POOL_PEER], candidates=network.get("peers", []),
+            chunk_size=network.get("transactionPool", {}).get(
+                "maxTransactionsPerRequest", None
             )
-        )
+        ))
         hash = identity.cSecp256k1.hash_sha256
         dumpJson(
             [hash(binascii.unhexlify(s)).decode("utf-8") for s in tx],
@@ -33,6 +33,9 @@ kw = {
         "blspy==2.0.3",
         "cSecp256k1==1.1.2"
     ],
+    "extras_require": {
+        "fast": ["orjson"]
+    },
     "license": "Copyright 2024, MIT licence",
     "classifiers": [
         "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+JSON codec benchmark on a forgery file with 10k contributions: standard
+`json` module with 4-space indentation (former `dumpJson` behaviour)
+versus shared codec, indented and compact.
+
+```bash
+~$ python -m test.bench_json
+```
+"""
+
+import os
+import json
+import random
+import timeit
+import tempfile
+
+from cSecp256k1 import PublicKey
+from mainsail import codec, identity, loadJson, dumpJson
+
+NUMBER = 20
+SIZE = 10000
+
+
+def forgery() -> dict:
+    puk = PublicKey.from_secret("secret").encode()
+    address = identity.get_wallet(puk, version=30)
+    return {
+        "reward": 1234567890, "blocks": 1542, "fee": 98765432,
+        "contributions": dict(
+            # vary the address body to get distinct keys quickly
+            [address[:-6] + f"{i:06d}", random.randint(1, int(1e12))]
+            for i in range(SIZE)
+        )
+    }
+
+
+def reference(data: dict, path: str) -> dict:
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump(data, out, indent=4)
+    with open(path, "r", encoding="utf-8") as in_:
+        return json.load(in_)
+
+
+def shared(data: dict, path: str) -> dict:
+    dumpJson(data, path)
+    return loadJson(path)
+
+
+def main() -> None:
+    data = forgery()
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "forgery.json")
+        ref = timeit.timeit(lambda: reference(data, path), number=NUMBER)
+        size = os.path.getsize(path)
+        print(
+            f"json indent=4 : {ref / NUMBER * 1e3:.2f} ms per dump+load - "
+            f"{size / 1024:.0f} KiB"
+        )
+        default = codec.CODEC
+        codecs = [codec.StdlibCodec]
+        if codec.orjson is not None:
+            codecs.append(codec.OrjsonCodec)
+        for cls in codecs:
+            for compact in [False, True]:
+                codec.use_codec(cls(compact=compact))
+                assert shared(data, path) == data
+                new = timeit.timeit(lambda: shared(data, path), number=NUMBER)
+                size = os.path.getsize(path)
+                print(
+                    f"{cls.name} compact={compact}: "
+                    f"{new / NUMBER * 1e3:.2f} ms per dump+load - "
+                    f"{size / 1024:.0f} KiB - speedup x{ref / new:.2f}"
+                )
+        codec.use_codec(default)
+
+
+if __name__ == "__main__":
+    main()
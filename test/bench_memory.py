@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-object memory of decoded transactions: transaction builders versus
+compact `TransactionRecord` objects.
+
+```bash
+~$ python -m test.bench_memory
+```
+"""
+
+import gc
+import tracemalloc
+
+from cSecp256k1 import PublicKey
+from mainsail import config, identity
+from mainsail.tx import v1, iter_deserialize
+
+NUMBER = 5000
+
+
+def _serials() -> list:
+    puk = PublicKey.from_secret("secret").encode()
+    result = []
+    for i in range(NUMBER):
+        tx = v1.Transfer(
+            1.0 + i, identity.get_wallet(
+                PublicKey.from_secret(f"secret{i % 50}").encode()
+            ), "payroll"
+        )
+        tx._senderPublicKey = puk
+        tx.nonce = i + 1
+        tx.signature = "ab" * 64
+        result.append(tx.serialize())
+    return result
+
+
+def _measure(serials: list, record: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    transactions = list(iter_deserialize(serials, record=record))
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del transactions
+    return (end - start) / NUMBER
+
+
+def main() -> None:
+    setattr(config, "version", 30)
+    serials = _serials()
+    wire = sum(len(serial) // 2 for serial in serials) / NUMBER
+    builder = _measure(serials, False)
+    record = _measure(serials, True)
+    print(f"wire size           : {wire:.0f} bytes")
+    print(f"Transfer builder    : {builder:.0f} bytes")
+    print(
+        f"TransactionRecord   : {record:.0f} bytes "
+        f"({100 * (1 - record / builder):.0f}% less)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+MultiPayment asset benchmark: per-payment building and packing versus
+batched `addPayments` and single-call asset packing. Batching gain is
+measured with a cold address cache on both paths, address cache gain is
+then measured on the batched path alone.
+
+```bash
+~$ python -m test.bench_multipayment
+```
+"""
+
+import timeit
+import base58
+import binascii
+
+from io import BytesIO
+from cSecp256k1 import PublicKey
+from mainsail import config, identity, pack, pack_bytes, ADDRESSES
+from mainsail.tx import v1
+
+NUMBER = 200
+
+
+def _per_payment_asset(tx) -> str:
+    # reference asset serialization, one pack call per field
+    buf = BytesIO()
+    pack("<H", buf, (len(tx.asset["payments"]), ))
+    for item in tx.asset["payments"]:
+        pack("<Q", buf, (item["amount"], ))
+        pack_bytes(buf, base58.b58decode_check(item["recipientId"]))
+    return binascii.hexlify(buf.getvalue()).decode("utf-8")
+
+
+def per_payment(amounts, addresses) -> str:
+    tx = v1.MultiPayment()
+    for amount, address in zip(amounts, addresses):
+        base58.b58decode_check(address)
+        tx.addPayment(amount, address)
+    return _per_payment_asset(tx)
+
+
+def batched(amounts, addresses) -> str:
+    tx = v1.MultiPayment()
+    tx.addPayments(amounts, addresses)
+    return tx.serializeAsset()
+
+
+def batched_cold(amounts, addresses) -> str:
+    # every address is decoded again as in per-payment path
+    ADDRESSES.clear()
+    return batched(amounts, addresses)
+
+
+def main() -> None:
+    setattr(config, "version", 30)
+    for n in [64, 128, 256]:
+        addresses = [
+            identity.get_wallet(PublicKey.from_secret(f"secret{i}").encode())
+            for i in range(n)
+        ]
+        amounts = [1.0 + i / 100 for i in range(n)]
+        assert per_payment(amounts, addresses) == batched(amounts, addresses)
+        ref = timeit.timeit(
+            lambda: per_payment(amounts, addresses), number=NUMBER
+        )
+        cold = timeit.timeit(
+            lambda: batched_cold(amounts, addresses), number=NUMBER
+        )
+        warm = timeit.timeit(
+            lambda: batched(amounts, addresses), number=NUMBER
+        )
+        print(
+            f"{n:>3} recipients: per-payment {ref / NUMBER * 1e3:.3f} ms - "
+            f"batched {cold / NUMBER * 1e3:.3f} ms (batching x"
+            f"{ref / cold:.2f}) - batched with warm address cache "
+            f"{warm / NUMBER * 1e3:.3f} ms (cache x{cold / warm:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from unittest import TestCase
+from mainsail import codec, loadJson, dumpJson
+
+
+class CodecTest(TestCase):
+
+    def setUp(self):
+        self.codec = codec.CODEC
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "data", "forgery.json")
+        self.data = {
+            "contributions": {"D5Ha4o3UTuTd59vjDw1F26mYhaRdXh7YPv": 12345},
+            "reward": 1.5, "blocks": 2, "nested": [None, True, "\U0001f919"]
+        }
+
+    def tearDown(self):
+        codec.use_codec(self.codec)
+        self.folder.cleanup()
+
+    def test_codecs(self):
+        codecs = [codec.StdlibCodec()]
+        if codec.orjson is not None:
+            codecs.append(codec.OrjsonCodec())
+        for item in codecs:
+            codec.use_codec(item)
+            for indent in [None, 4]:
+                serial = codec.dumps(self.data, indent)
+                self.assertIsInstance(serial, bytes)
+                self.assertEqual(codec.loads(serial), self.data)
+                self.assertEqual(codec.loads(serial.decode()), self.data)
+            with self.assertRaises(ValueError):
+                codec.loads(b"not json")
+
+    def test_files(self):
+        dumpJson(self.data, self.path)
+        with open(self.path, "rb") as f:
+            indented = f.read()
+        self.assertIn(b"\n", indented)
+        self.assertEqual(loadJson(self.path), self.data)
+        codec.use_codec(codec.StdlibCodec(compact=True))
+        dumpJson(self.data, self.path)
+        with open(self.path, "rb") as f:
+            compact = f.read()
+        self.assertNotIn(b"\n", compact)
+        self.assertLess(len(compact), len(indented))
+        self.assertEqual(loadJson(self.path), self.data)
+        # json.dump options still supported
+        dumpJson(self.data, self.path, sort_keys=True, indent=2)
+        self.assertEqual(loadJson(self.path), self.data)
+        self.assertEqual(loadJson(self.path + ".missing"), {})
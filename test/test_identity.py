@@ -2,7 +2,7 @@
 
 import os
 from unittest import TestCase
-from mainsail import identity, loadJson
+from mainsail import identity, loadJson, AddressCodec
 
 
 class KeyRingTest(TestCase):
@@ -55,3 +55,51 @@ class DefinitionTest(TestCase):
 
     def test_puk_combination(self):
         pass
+
+
+class AddressCodecTest(TestCase):
+
+    def test_round_trip_and_counters(self):
+        codec = AddressCodec(maxsize=2)
+        address = "D5Ha4o3UTuTd59vjDw1F26mYhaRdXh7YPv"
+        raw = codec.decode(address)
+        self.assertEqual(codec.encode(raw), address)
+        self.assertEqual(codec.decode(address), raw)
+        self.assertEqual(codec.stats()["hits"], 2)
+        self.assertEqual(codec.stats()["misses"], 1)
+        self.assertRaises(ValueError, codec.decode, address[:-1] + "x")
+
+    def test_bounded_size(self):
+        codec = AddressCodec(maxsize=2)
+        raws = [bytes([30]) + os.urandom(20) for i in range(3)]
+        addresses = [codec.encode(raw) for raw in raws]
+        self.assertEqual(codec.stats()["size"], 2)
+        self.assertEqual(codec.decode(addresses[0]), raws[0])
+        self.assertEqual(codec.stats()["misses"], 4)
+
+
+class VerifyBatchTest(TestCase):
+
+    def _triples(self) -> list:
+        signer = identity.KeyRing.create(int.from_bytes(os.urandom(32)))
+        puk = signer.puk().encode()
+        triples = [
+            (puk, f"message {i}", signer.sign(f"message {i}").raw())
+            for i in range(4)
+        ]
+        # swap messages of the last two triples
+        triples[-1], triples[-2] = \
+            triples[-1][:1] + triples[-2][1:2] + triples[-1][2:], \
+            triples[-2][:1] + triples[-1][1:2] + triples[-2][2:]
+        return triples
+
+    def test_sequential(self):
+        self.assertEqual(
+            identity.verify_batch(self._triples()), [True, True, False, False]
+        )
+
+    def test_process_pool(self):
+        self.assertEqual(
+            identity.verify_batch(self._triples(), processes=2, threshold=1),
+            [True, True, False, False]
+        )
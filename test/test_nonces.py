@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from cSecp256k1 import PublicKey
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from mainsail import config, identity, nonces
+from mainsail.tx import v1
+
+PUK = PublicKey.from_secret("secret").encode()
+
+
+class NonceProviderTest(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.attributes = {}
+        self.provider = nonces.NonceProvider(fetch=self._fetch)
+
+    def _fetch(self, puk: str) -> dict:
+        self.calls.append(puk)
+        return {
+            "publicKey": puk, "nonce": "41",
+            "attributes": dict(self.attributes)
+        }
+
+    def test_reservation(self):
+        self.assertEqual(self.provider.peek(PUK), 42)
+        self.assertEqual(self.provider.reserve(PUK), 42)
+        self.assertEqual(self.provider.reserve(PUK, 10), 43)
+        self.assertEqual(self.provider.peek(PUK), 53)
+        self.provider.commit(PUK, 60)
+        self.assertEqual(self.provider.peek(PUK), 61)
+        self.assertEqual(self.calls, [PUK])
+        self.provider.resync(PUK)
+        self.assertEqual(self.provider.peek(PUK), 42)
+        self.assertEqual(self.calls, [PUK, PUK])
+
+    def test_offline(self):
+        def _offline(puk: str) -> dict:
+            raise ConnectionError()
+        provider = nonces.NonceProvider(fetch=_offline)
+        self.assertEqual(provider.peek(PUK), 1)
+        self.assertEqual(provider.wallet(PUK), {})
+        provider.set(PUK, 5)
+        self.assertEqual(provider.reserve(PUK, 2), 5)
+        self.assertEqual(provider.peek(PUK), 7)
+
+    def test_builders(self):
+        setattr(config, "version", 30)
+        former = nonces.PROVIDER
+        nonces.use_provider(self.provider)
+        try:
+            signed = []
+            for i in range(3):
+                tx = v1.Transfer(1.0, identity.get_wallet(PUK))
+                tx.sign("secret")
+                signed.append(tx.nonce)
+            vote = v1.Vote(PUK)
+            vote.sign("secret")
+            signed.append(vote.nonce)
+        finally:
+            nonces.use_provider(former)
+        self.assertEqual(signed, [42, 43, 44, 45])
+        self.assertEqual(vote.asset["votes"], [PUK])
+        # nonce sync plus wallet attributes read by vote
+        self.assertEqual(self.calls, [PUK, PUK])
+
+    def test_sign_again(self):
+        setattr(config, "version", 30)
+        former = nonces.PROVIDER
+        nonces.use_provider(self.provider)
+        try:
+            tx = v1.Transfer(1.0, identity.get_wallet(PUK))
+            tx.sign("secret")
+            tx.fee = 20000000
+            tx.sign("secret")
+            self.assertEqual(tx.nonce, 42)
+            tx.sign("secret", nonce=50)
+            tx.sign("secret")
+            self.assertEqual(tx.nonce, 50)
+            self.assertEqual(self.provider.peek(PUK), 51)
+        finally:
+            nonces.use_provider(former)
+
+    def test_concurrent_builders(self):
+        setattr(config, "version", 30)
+        former = nonces.PROVIDER
+        nonces.use_provider(self.provider)
+
+        def build(i):
+            tx = v1.Transfer(1.0, identity.get_wallet(PUK))
+            tx.senderPublicKey = PUK
+            return tx.nonce
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                built = sorted(executor.map(build, range(100)))
+        finally:
+            nonces.use_provider(former)
+        self.assertEqual(built, list(range(42, 142)))
+
+    def test_fresh_attributes(self):
+        setattr(config, "version", 30)
+        former = nonces.PROVIDER
+        nonces.use_provider(self.provider)
+        other = PublicKey.from_secret("other").encode()
+        try:
+            first = v1.Vote(PUK)
+            first.sign("secret")
+            # first vote is now applied on network
+            self.attributes["vote"] = PUK
+            second = v1.Vote(other)
+            second.sign("secret")
+        finally:
+            nonces.use_provider(former)
+        self.assertEqual(first.asset["unvotes"], [])
+        self.assertEqual(second.asset["unvotes"], [PUK])
+        self.assertEqual(second.nonce, first.nonce + 1)
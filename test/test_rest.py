@@ -0,0 +1,1130 @@
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import json
+import hashlib
+import time
+import asyncio
+import requests
+import tempfile
+import threading
+
+from urllib.parse import urlparse, parse_qs
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from mainsail import rest
+from mainsail.rest import WalletResolver
+from mainsail.tx import v1
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.calls.append((self.path, self.client_address[1]))
+        self._reply(200, {"path": self.path})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        self.server.calls.append((self.path, self.client_address[1]))
+        self._reply(200, {"path": self.path, "data": data})
+
+
+class SlowHandler(Handler):
+
+    def do_GET(self):
+        time.sleep(0.5)
+        Handler.do_GET(self)
+
+
+class PagedHandler(Handler):
+    items = list(range(250))
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page, limit = int(query["page"][0]), int(query.get("limit", [100])[0])
+        self.server.calls.append((self.path, self.client_address[1]))
+        page_count = -(-len(self.items) // limit)
+        meta = {
+            "count": limit, "totalCount": len(self.items),
+            "next": None if page >= page_count else f"?page={page + 1}"
+        }
+        if "nopagecount" in self.path:
+            meta.pop("totalCount")
+        else:
+            meta["pageCount"] = page_count
+        self._reply(200, {
+            "meta": meta,
+            "data": self.items[(page - 1) * limit:page * limit]
+        })
+
+
+class NodeServer(object):
+    "Local HTTP node running in a background thread."
+
+    def __init__(
+        self, handler: type = Handler, host: str = "127.0.0.1"
+    ) -> None:
+        self.host = host
+        self.httpd = ThreadingHTTPServer((host, 0), handler, False)
+        # bursts of concurrent connections must not wait on listen backlog
+        self.httpd.request_queue_size = 128
+        self.httpd.server_bind()
+        self.httpd.server_activate()
+        self.httpd.daemon_threads = True
+        self.httpd.calls = []
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def calls(self) -> list:
+        return self.httpd.calls
+
+    def peer(self, port_name: str = "api-http") -> dict:
+        return {"ip": self.host, "ports": {port_name: self.port}}
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class RestTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node = NodeServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+
+    def setUp(self):
+        self.node.calls.clear()
+        rest.SESSIONS.close()
+        self.peer = self.node.peer()
+        self._peers = getattr(rest.config, "peers", None)
+        rest.config.peers = [self.peer]
+
+    def tearDown(self):
+        if self._peers is None:
+            del rest.config.peers
+        else:
+            rest.config.peers = self._peers
+
+    def test_keep_alive(self):
+        for i in range(5):
+            resp = rest.GET.api.wallets(str(i), page=1)
+            self.assertEqual(resp["path"], f"/api/wallets/{i}?page=1")
+        # all calls went through the same TCP connection
+        self.assertEqual(len(set(port for _, port in self.node.calls)), 1)
+
+    def test_post(self):
+        resp = rest.POST.api.transactions(
+            transactions=["00"], peer=self.node.peer("api-transaction-pool")
+        )
+        self.assertEqual(resp["data"], {"transactions": ["00"]})
+
+    def test_thread_safety(self):
+        results = []
+
+        def worker():
+            for i in range(10):
+                results.append(rest.GET.api.blocks(str(i))["path"])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 40)
+        self.assertEqual(len(rest.SESSIONS._sessions), 1)
+        # connections are reused across threads up to the adapter pool size
+        self.assertLessEqual(
+            len(set(port for _, port in self.node.calls)),
+            max(rest.SESSIONS.pool_size, rest.SESSIONS.async_size)
+        )
+
+    def test_configure(self):
+        rest.GET.api.wallets()
+        rest.SESSIONS.configure(pool_size=2, timeout=(1, 2))
+        self.assertEqual(rest.SESSIONS._sessions, {})
+        self.assertEqual(rest.SESSIONS.timeout, (1, 2))
+        rest.SESSIONS.configure(timeout=rest.TIMEOUT, pool_size=10)
+
+    def test_async(self):
+        async def main():
+            return await asyncio.gather(
+                *[rest.AGET.api.wallets(str(i)) for i in range(20)],
+                rest.APOST.api.transactions(
+                    transactions=["00"],
+                    peer=self.node.peer("api-transaction-pool")
+                )
+            )
+
+        results = asyncio.run(main())
+        self.assertEqual(
+            [r["path"] for r in results[:-1]],
+            [f"/api/wallets/{i}" for i in range(20)]
+        )
+        self.assertEqual(results[-1]["data"], {"transactions": ["00"]})
+        self.assertIsInstance(rest.AGET.api.wallets, rest.AsyncEndPoint)
+        self.assertLessEqual(
+            len(set(port for _, port in self.node.calls)),
+            rest.SESSIONS.async_size
+        )
+
+    def test_async_concurrency(self):
+        slow = NodeServer(SlowHandler, "127.0.0.2")
+        self.addCleanup(slow.stop)
+        # per peer concurrency is not what is measured here
+        limiter, rest.LIMITER = rest.LIMITER, rest.PeerLimiter(limit=64)
+        self.addCleanup(setattr, rest, "LIMITER", limiter)
+        endpoint = rest.AsyncEndPoint(ports=["api-http"])
+
+        async def main():
+            return await asyncio.gather(*[
+                endpoint.api.wallets(str(i), peer=slow.peer())
+                for i in range(40)
+            ])
+
+        start = time.perf_counter()
+        results = asyncio.run(main())
+        # 40 calls of 0.5 s each are not limited by pool_size
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(len(results), 40)
+
+
+class PeerSchedulerTest(TestCase):
+
+    def setUp(self):
+        self.scheduler = rest.PeerScheduler(max_errors=2, cooldown=60)
+        self.fast = {"ip": "10.0.0.1", "ports": {"api-http": 4003}}
+        self.slow = {"ip": "10.0.0.2", "ports": {"api-http": 4003}}
+        self.pool = {
+            "ip": "10.0.0.3", "ports": {"api-transaction-pool": 4007}
+        }
+        self.peers = [self.slow, self.pool, self.fast]
+
+    def _best(self) -> dict:
+        return self.scheduler.select(["api-http"], self.peers)
+
+    def test_select(self):
+        self.scheduler.success(self.slow, 300)
+        self.scheduler.success(self.fast, 50)
+        self.assertIs(self._best(), self.fast)
+        self.assertIs(
+            self.scheduler.select(["api-transaction-pool"], self.peers),
+            self.pool
+        )
+        self.assertIsNone(self.scheduler.select(["api-webhook"], self.peers))
+
+    def test_ejection(self):
+        self.scheduler.success(self.slow, 300)
+        self.scheduler.success(self.fast, 50)
+        self.scheduler.failure(self.fast)
+        self.assertIs(self._best(), self.fast)
+        self.scheduler.failure(self.fast)
+        self.assertIs(self._best(), self.slow)
+        # ejected peers are still used when nothing else is available
+        self.scheduler.failure(self.slow)
+        self.scheduler.failure(self.slow)
+        self.assertIs(self._best(), self.fast)
+        # first success restores the peer
+        self.scheduler.success(self.slow, 300)
+        self.assertIs(self._best(), self.slow)
+
+    def test_endpoint(self):
+        node = NodeServer()
+        dead = {"ip": "127.0.0.2", "ports": {"api-http": 1}}
+        peers = getattr(rest.config, "peers", None)
+        scheduler, rest.SCHEDULER = rest.SCHEDULER, self.scheduler
+        try:
+            rest.config.peers = [dead, node.peer()]
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    rest.GET.api.wallets(peer=dead)
+            for _ in range(5):
+                resp = rest.GET.api.wallets()
+                self.assertEqual(resp["path"], "/api/wallets")
+            self.assertEqual(len(node.calls), 5)
+            stats = self.scheduler.stats()
+            self.assertEqual(stats["127.0.0.2"]["ejections"], 1)
+        finally:
+            rest.SCHEDULER = scheduler
+            node.stop()
+            if peers is None:
+                del rest.config.peers
+            else:
+                rest.config.peers = peers
+
+
+class HedgingTest(TestCase):
+
+    def setUp(self):
+        self.slow = NodeServer(SlowHandler)
+        # scheduler identifies peers by ip
+        self.fast = NodeServer(host="127.0.0.2")
+        self._peers = getattr(rest.config, "peers", None)
+        self._delay, rest.HEDGE_DELAY = rest.HEDGE_DELAY, 0.05
+        self._scheduler, rest.SCHEDULER = rest.SCHEDULER, rest.PeerScheduler()
+        rest.config.peers = [self.slow.peer(), self.fast.peer()]
+        # slow peer is selected first
+        rest.SCHEDULER.success(self.slow.peer(), 1)
+        rest.SCHEDULER.success(self.fast.peer(), 10)
+        self.endpoint = rest.EndPoint(ports=["api-http"], hedge=95)
+
+    def tearDown(self):
+        self.slow.stop()
+        self.fast.stop()
+        rest.HEDGE_DELAY = self._delay
+        rest.SCHEDULER = self._scheduler
+        if self._peers is None:
+            del rest.config.peers
+        else:
+            rest.config.peers = self._peers
+
+    def test_hedged(self):
+        start = time.perf_counter()
+        resp = self.endpoint.api.blocks(page=2)
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(resp["path"], "/api/blocks?page=2")
+        self.assertEqual(len(self.fast.calls), 1)
+
+    def test_pinned_peer(self):
+        resp = self.endpoint.api.blocks(peer=self.slow.peer(), page=2)
+        self.assertEqual(resp["path"], "/api/blocks?page=2")
+        self.assertEqual(len(self.slow.calls), 1)
+        self.assertEqual(len(self.fast.calls), 0)
+
+    def test_delay_per_path(self):
+        for i in range(20):
+            rest.SCHEDULER.success(self.fast.peer(), 10, "/api/blocks")
+            rest.SCHEDULER.success(self.fast.peer(), 500, "/api/voters")
+        self.assertEqual(self.endpoint.api.blocks._hedging(), 0.01)
+        self.assertEqual(self.endpoint.api._hedging(("voters",)), 0.5)
+        self.assertEqual(
+            self.endpoint.api.wallets._hedging(), rest.HEDGE_DELAY
+        )
+
+    def test_not_hedged(self):
+        resp = self.endpoint.api.blocks(peer=self.fast.peer())
+        self.assertEqual(resp["path"], "/api/blocks")
+        self.assertEqual(len(self.slow.calls), 0)
+        # POST calls are never hedged
+        endpoint = rest.EndPoint(
+            ports=["api-http"], hedge=95, func=requests.post
+        )
+        self.assertIsNone(endpoint.api.transactions._hedging())
+
+    def test_async_hedged(self):
+        endpoint = rest.AsyncEndPoint(ports=["api-http"], hedge=95)
+        start = time.perf_counter()
+        resp = asyncio.run(endpoint.api.blocks())
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(resp["path"], "/api/blocks")
+
+
+class PaginationTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node = NodeServer(PagedHandler)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+
+    def setUp(self):
+        self.node.calls.clear()
+        self.peer = self.node.peer()
+
+    def test_paginate(self):
+        items = list(rest.paginate(
+            rest.GET.api.voters, limit=10, peer=self.peer, window=3
+        ))
+        self.assertEqual(items, PagedHandler.items)
+        self.assertEqual(len(self.node.calls), 25)
+
+    def test_follow_next(self):
+        items = list(rest.paginate(
+            rest.GET.api.nopagecount, limit=100, peer=self.peer
+        ))
+        self.assertEqual(items, PagedHandler.items)
+
+    def test_early_stop(self):
+        for item in rest.paginate(
+            rest.GET.api.voters, limit=10, peer=self.peer, window=2
+        ):
+            if item == 15:
+                break
+        # first page, second page and at most window pages ahead
+        self.assertLessEqual(len(self.node.calls), 4)
+
+
+class ResponseCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node = NodeServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+
+    def setUp(self):
+        self.node.calls.clear()
+        self.peer = self.node.peer()
+        self._cache, rest.CACHE = rest.CACHE, rest.ResponseCache(maxsize=2)
+        self.endpoint = rest.EndPoint(ports=["api-http"], ttl=60)
+
+    def tearDown(self):
+        rest.CACHE = self._cache
+
+    def test_hit(self):
+        first = self.endpoint.api.wallets("toons", peer=self.peer)
+        first["path"] = "modified"
+        second = self.endpoint.api.wallets("toons", peer=self.peer)
+        self.assertEqual(second["path"], "/api/wallets/toons")
+        self.assertEqual(len(self.node.calls), 1)
+        self.assertEqual(
+            rest.CACHE.stats(),
+            {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+        )
+        # not cached by default
+        rest.GET.api.wallets("toons", peer=self.peer)
+        self.assertEqual(len(self.node.calls), 2)
+
+    def test_expiration_and_size(self):
+        endpoint = rest.EndPoint(ports=["api-http"], ttl=0.05)
+        endpoint.api.wallets("toons", peer=self.peer)
+        time.sleep(0.1)
+        endpoint.api.wallets("toons", peer=self.peer)
+        self.assertEqual(len(self.node.calls), 2)
+        for name in ["a", "b", "c"]:
+            self.endpoint.api.wallets(name, peer=self.peer)
+        self.assertEqual(rest.CACHE.stats()["size"], 2)
+
+    def test_invalidate(self):
+        self.endpoint.api.wallets("toons", peer=self.peer)
+        self.endpoint.api.blocks(peer=self.peer, page=1)
+        self.assertEqual(rest.CACHE.invalidate("api/wallets"), 1)
+        self.endpoint.api.wallets("toons", peer=self.peer)
+        self.endpoint.api.blocks(peer=self.peer, page=1)
+        self.assertEqual(len(self.node.calls), 3)
+        self.assertEqual(rest.CACHE.invalidate(), 2)
+
+    def test_scope(self):
+        other = NodeServer(host="127.0.0.2")
+        self.addCleanup(other.stop)
+        self.endpoint.api.wallets("toons", peer=self.peer)
+        self.endpoint.api.wallets("toons", peer=other.peer())
+        self.assertEqual(len(other.calls), 1)
+        rest.CACHE.clear()
+        for name in ["peers", "nethash"]:
+            if hasattr(rest.config, name):
+                self.addCleanup(
+                    setattr, rest.config, name, getattr(rest.config, name)
+                )
+            else:
+                self.addCleanup(delattr, rest.config, name)
+        rest.config.peers = [self.peer]
+        for name in ["a" * 64, "b" * 64, "a" * 64]:
+            rest.config.nethash = name
+            self.endpoint.api.blocks()
+        self.assertEqual(len(self.node.calls), 3)
+
+
+class SingleFlightTest(TestCase):
+
+    def setUp(self):
+        self.node = NodeServer(SlowHandler)
+        self.peer = self.node.peer()
+
+    def tearDown(self):
+        self.node.stop()
+
+    def test_coalescing(self):
+        results, flights = [], rest.FLIGHTS.stats()
+
+        def worker(name):
+            results.append(rest.GET.api.wallets(name, peer=self.peer)["path"])
+
+        threads = [
+            threading.Thread(target=worker, args=(name,))
+            for name in ["toons"] * 5 + ["arkpool"] * 3
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(results),
+            ["/api/wallets/arkpool"] * 3 + ["/api/wallets/toons"] * 5
+        )
+        self.assertEqual(len(self.node.calls), 2)
+        stats = rest.FLIGHTS.stats()
+        self.assertEqual(stats["coalesced"] - flights["coalesced"], 6)
+        self.assertEqual(stats["in_flight"], 0)
+        # a new call is issued once previous one is over
+        rest.GET.api.wallets("toons", peer=self.peer)
+        self.assertEqual(len(self.node.calls), 3)
+
+    def test_exception(self):
+        flights = rest.SingleFlight()
+        event = threading.Event()
+        errors = []
+
+        def fail():
+            event.wait()
+            raise ValueError("boom")
+
+        def worker():
+            try:
+                flights.do("key", fail)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        event.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(flights.stats()["coalesced"], 2)
+
+
+class PoolHandler(Handler):
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        transactions = json.loads(self.rfile.read(length))["transactions"]
+        self.server.calls.append(len(transactions))
+        # accept transactions whose index matches server parity
+        accept = [
+            i for i in range(len(transactions))
+            if i % 2 == self.server.parity
+        ]
+        invalid = [i for i in range(len(transactions)) if i not in accept]
+        self._reply(200, {
+            "data": {
+                "accept": accept, "broadcast": accept, "invalid": invalid,
+                "excess": []
+            },
+            "errors": dict([str(i), {"type": "ERR_BAD"}] for i in invalid)
+        })
+
+
+class BroadcastTest(TestCase):
+    port_name = "api-transaction-pool"
+
+    def setUp(self):
+        self.even = NodeServer(PoolHandler, "127.0.0.1")
+        self.even.httpd.parity = 0
+        self.odd = NodeServer(PoolHandler, "127.0.0.2")
+        self.odd.httpd.parity = 1
+        self.transactions = ["%04x" % i for i in range(10)]
+        self.ids = [
+            hashlib.sha256(bytes.fromhex(tx)).hexdigest()
+            for tx in self.transactions
+        ]
+        self._peers = getattr(rest.config, "peers", None)
+        rest.config.peers = [self.odd.peer(self.port_name)]
+
+    def tearDown(self):
+        self.even.stop()
+        self.odd.stop()
+        if self._peers is None:
+            del rest.config.peers
+        else:
+            rest.config.peers = self._peers
+
+    def test_merge(self):
+        resp = rest.broadcast(
+            self.transactions, peers=[self.even.peer(self.port_name)],
+            chunk_size=3
+        )
+        # chunks of 3 transactions sent to both peers
+        self.assertEqual(sorted(self.even.calls), [1, 3, 3, 3])
+        self.assertEqual(sorted(self.odd.calls), [1, 3, 3, 3])
+        # 0, 1, 2 | 3, 4, 5 | 6, 7, 8 | 9: even peer accepts first and last
+        # items of three-items chunks, odd peer accepts the middle ones
+        self.assertEqual(resp["data"]["accept"], self.ids)
+        self.assertEqual(resp["data"]["invalid"], [])
+        self.assertEqual(resp["errors"], {})
+
+    def test_peer_down(self):
+        dead = {"ip": "127.0.0.3", "ports": {"api-transaction-pool": 1}}
+        resp = rest.broadcast(
+            self.transactions, peers=[self.even.peer(self.port_name), dead],
+            fanout=2
+        )
+        self.assertEqual(resp["data"]["accept"], self.ids[::2])
+        self.assertEqual(resp["data"]["invalid"], self.ids[1::2])
+        self.assertEqual(
+            resp["errors"][self.ids[1]], {"type": "ERR_BAD"}
+        )
+        self.assertEqual(self.odd.calls, [])
+
+    def test_candidates(self):
+        other = NodeServer(PoolHandler, "127.0.0.3")
+        self.addCleanup(other.stop)
+        other.httpd.parity = 1
+        resp = rest.broadcast(
+            self.transactions, peers=[self.even.peer(self.port_name)],
+            fanout=2, candidates=[other.peer(self.port_name)]
+        )
+        self.assertEqual(resp["data"]["accept"], self.ids)
+        # config.peers are not used when candidates are given
+        self.assertEqual(self.odd.calls, [])
+        self.assertEqual(len(other.calls), 1)
+
+
+class MetricsTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node = NodeServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+
+    def setUp(self):
+        self.peer = self.node.peer()
+        self._metrics, rest.METRICS = rest.METRICS, rest.Metrics()
+        self._cache, rest.CACHE = rest.CACHE, rest.ResponseCache()
+
+    def tearDown(self):
+        rest.METRICS = self._metrics
+        rest.CACHE = self._cache
+
+    def test_disabled(self):
+        rest.GET.api.wallets("toons", peer=self.peer)
+        snapshot = rest.METRICS.snapshot()
+        self.assertEqual(snapshot["paths"], {})
+        self.assertEqual(snapshot["events"], {})
+
+    def test_measures(self):
+        rest.METRICS.enable()
+        endpoint = rest.EndPoint(ports=["api-http"], ttl=60)
+        for _ in range(3):
+            endpoint.api.wallets("toons", peer=self.peer)
+        rest.POST.api.transactions(
+            transactions=["00"], peer=self.node.peer("api-transaction-pool")
+        )
+        snapshot = rest.METRICS.snapshot()
+        wallets = snapshot["paths"]["api/wallets"]
+        self.assertEqual(wallets["count"], 1)
+        self.assertEqual(wallets["status"], {"200": 1})
+        self.assertGreater(wallets["bytes_in"], 0)
+        self.assertEqual(wallets["bytes_out"], 0)
+        self.assertGreater(
+            snapshot["paths"]["api/transactions"]["bytes_out"], 0
+        )
+        self.assertEqual(snapshot["peers"]["127.0.0.1"]["count"], 2)
+        self.assertEqual(
+            snapshot["events"],
+            {"cache_miss": {"api/wallets": 1}, "cache_hit": {"api/wallets": 2}}
+        )
+        text = rest.METRICS.exposition()
+        self.assertIn(
+            'mainsail_rest_path_latency_ms_count{path="api/wallets"} 1', text
+        )
+        self.assertIn(
+            'mainsail_rest_peer_latency_ms_bucket{peer="127.0.0.1",le="+Inf"}'
+            ' 2', text
+        )
+        self.assertIn(
+            'mainsail_rest_path_responses_total{path="api/wallets",'
+            'status="200"} 1', text
+        )
+        self.assertIn(
+            'mainsail_rest_events_total{event="cache_hit",path="api/wallets"}'
+            ' 2', text
+        )
+        # connection errors are recorded with exception name
+        with self.assertRaises(requests.ConnectionError):
+            rest.GET.api.blocks(peer={"ip": "127.0.0.3", "ports": {"x": 1}})
+        self.assertEqual(
+            rest.METRICS.snapshot()["peers"]["127.0.0.3"]["status"],
+            {"ConnectionError": 1}
+        )
+
+
+class NetworkHandler(Handler):
+    peers = [
+        {"ip": "10.0.0.2", "ports": {"api-http": 4003}, "latency": 30},
+        {"ip": "10.0.0.1", "ports": {"api-http": 4003}, "latency": 10},
+        {"ip": "10.0.0.3", "ports": {"api-http": 4003}, "latency": 900}
+    ]
+
+    def do_GET(self):
+        time.sleep(0.2)
+        self.server.calls.append((self.path, self.client_address[1]))
+        if self.path.startswith("/api/node/configuration"):
+            data = {"nethash": "f" * 64, "version": 30}
+        elif self.path.startswith("/api/node/fees"):
+            data = {"1": {"transfer": {"avg": str(len(self.server.calls))}}}
+        else:
+            data = self.peers
+        self._reply(200, {"data": data})
+
+
+class NetworkTest(TestCase):
+
+    def setUp(self):
+        self.node = NodeServer(NetworkHandler)
+        self.url = f"http://127.0.0.1:{self.node.port}"
+        self.folder = tempfile.TemporaryDirectory()
+        self._data, rest.config.DATA = rest.config.DATA, self.folder.name
+        self._config = dict(
+            (name, getattr(rest.config, name)) for name in rest.config._track
+        )
+
+    def tearDown(self):
+        self.node.stop()
+        self.folder.cleanup()
+        rest.config.DATA = self._data
+        rest.config._clear()
+        for name, value in self._config.items():
+            rest.config._set(name, value)
+
+    def test_use_network(self):
+        start = time.perf_counter()
+        rest.use_network(self.url)
+        # three calls of 0.2 s each ran concurrently
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(rest.config.nethash, "f" * 64)
+        self.assertEqual(
+            [p["ip"] for p in rest.config.peers], ["10.0.0.1", "10.0.0.2"]
+        )
+        self.assertIn("transfer", rest.config.fees["1"])
+        self.assertLess(rest.staleness("fees"), 1)
+        self.assertTrue(rest.load_network("f" * 64))
+        self.assertEqual(rest.config.nethash, "f" * 64)
+
+    def test_refresher(self):
+        rest.use_network(self.url)
+        rest.config.updated["fees"] -= 100
+        self.assertGreater(rest.staleness("fees"), 100)
+        fees = rest.config.fees
+        refresher = rest.NetworkRefresher(self.url, interval=0.05)
+        refresher.start()
+        time.sleep(0.4)
+        refresher.stop()
+        self.assertNotEqual(rest.config.fees, fees)
+        self.assertLess(rest.staleness("fees"), 1)
+        # stored snapshot was refreshed too
+        refreshed = rest.config.fees
+        rest.config._clear()
+        self.assertEqual(rest.staleness("peers"), float("inf"))
+        rest.load_network("f" * 64)
+        self.assertEqual(rest.config.fees, refreshed)
+
+    def test_refresher_survives_errors(self):
+        rest.use_network(self.url)
+        update, calls = rest.config._update, []
+
+        def _update(name, **values):
+            calls.append(name)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            return update(name, **values)
+
+        rest.config._update = _update
+        refresher = rest.NetworkRefresher(self.url, interval=0.05)
+        try:
+            with self.assertLogs(rest.LOGGER, "ERROR"):
+                refresher.start()
+                time.sleep(0.8)
+            self.assertTrue(refresher._thread.is_alive())
+        finally:
+            refresher.stop()
+            rest.config._update = update
+        self.assertGreater(len(calls), 1)
+
+    def test_concurrent_snapshot_updates(self):
+        rest.use_network(self.url)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda i: rest.config._update("f" * 64, index=i), range(50)
+            ))
+        self.assertTrue(all(results))
+        self.assertEqual(
+            [n for n in os.listdir(self.folder.name) if n.endswith(".tmp")],
+            []
+        )
+
+    def test_refresher_other_network(self):
+        rest.use_network(self.url)
+        fees = rest.config.fees
+        refresher = rest.NetworkRefresher(self.url, nethash="e" * 64)
+        self.assertFalse(refresher.refresh())
+        self.assertEqual(rest.config.fees, fees)
+        self.assertFalse(rest.load_network("e" * 64))
+
+
+class CrawlerHandler(Handler):
+
+    def do_GET(self):
+        if self.path.startswith("/api/peers"):
+            self._reply(200, {"data": self.server.peers})
+        else:
+            time.sleep(self.server.delay)
+            self._reply(200, {})
+
+
+class CrawlerTest(TestCase):
+
+    def setUp(self):
+        self.nodes = [
+            NodeServer(CrawlerHandler, f"127.0.0.{i}") for i in range(1, 4)
+        ]
+        for node, delay in zip(self.nodes, [0.1, 0.05, 0.]):
+            node.httpd.delay = delay
+        seed, second, third = self.nodes
+        dead = {"ip": "127.0.0.4", "ports": {"@mainsail/api-http": 1}}
+        # seed knows second and a dead peer, second knows third
+        seed.httpd.peers = [self._peer(seed), self._peer(second), dead]
+        second.httpd.peers = [self._peer(seed), self._peer(third)]
+        third.httpd.peers = [self._peer(second)]
+        self.seed = f"http://127.0.0.1:{seed.port}"
+        self._peers = getattr(rest.config, "peers", None)
+
+    def tearDown(self):
+        for node in self.nodes:
+            node.stop()
+        if self._peers is None:
+            del rest.config.peers
+        else:
+            rest.config.peers = self._peers
+
+    @staticmethod
+    def _peer(node: NodeServer) -> dict:
+        return {
+            "ip": node.host, "latency": 1, "ports": {
+                "@mainsail/api-http": node.port, "@mainsail/core-p2p": 4000,
+                "@mainsail/api-webhook": -1
+            }
+        }
+
+    def test_crawl(self):
+        peers = rest.crawl_peers(self.seed, depth=1, timeout=1)
+        self.assertEqual(rest.config.peers, peers)
+        # third peer found through second one, dead peer dropped and ranking
+        # follows measured round-trip times
+        self.assertEqual(
+            [p["ip"] for p in peers], ["127.0.0.3", "127.0.0.2", "127.0.0.1"]
+        )
+        self.assertEqual(
+            peers[0]["ports"], {"api-http": self.nodes[2].port}
+        )
+        self.assertGreaterEqual(peers[-1]["latency"], 100)
+
+    def test_no_pooled_session(self):
+        rest.SESSIONS.close()
+        rest.crawl_peers(self.seed, depth=1, timeout=1)
+        self.assertEqual(rest.SESSIONS._sessions, {})
+
+    def test_depth(self):
+        peers = rest.crawl_peers(self.seed, depth=0, timeout=1)
+        self.assertEqual(
+            [p["ip"] for p in peers], ["127.0.0.2", "127.0.0.1"]
+        )
+
+    def test_nothing_measured(self):
+        rest.config.peers = [self._peer(self.nodes[0])]
+        for node in self.nodes:
+            node.httpd.peers = [
+                {"ip": "127.0.0.4", "ports": {"@mainsail/api-http": 1}}
+            ]
+        with self.assertLogs(rest.LOGGER, "WARNING"):
+            peers = rest.crawl_peers(self.seed, depth=0, timeout=1)
+        self.assertEqual(peers, [self._peer(self.nodes[0])])
+        self.assertEqual(rest.config.peers, peers)
+
+
+class ThrottleHandler(Handler):
+
+    def do_GET(self):
+        self.server.calls.append((self.path, self.client_address[1]))
+        if len(self.server.calls) <= 2:
+            body = b'{"error": "Too Many Requests"}'
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._reply(200, {"path": self.path})
+
+
+class PeerLimiterTest(TestCase):
+
+    def setUp(self):
+        self.peer = {"ip": "10.0.0.1"}
+
+    def test_concurrency(self):
+        limiter = rest.PeerLimiter(limit=2)
+        limiter.acquire(self.peer)
+        limiter.acquire(self.peer)
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire(self.peer)
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release(self.peer)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(limiter.stats()["10.0.0.1"]["in_flight"], 2)
+
+    def test_rate(self):
+        limiter = rest.PeerLimiter(rate=20, burst=1)
+        start = time.perf_counter()
+        for _ in range(5):
+            limiter.acquire(self.peer)
+            limiter.release(self.peer)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.19)
+
+    def test_aimd(self):
+        limiter = rest.PeerLimiter(limit=8)
+        limiter.acquire(self.peer)
+        limiter.release(self.peer, throttled=True, retry_after=0.1)
+        stats = limiter.stats()["10.0.0.1"]
+        self.assertEqual(stats["limit"], 4)
+        self.assertEqual(stats["rate"], 25)
+        start = time.perf_counter()
+        limiter.acquire(self.peer)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+        limiter.release(self.peer)
+        stats = limiter.stats()["10.0.0.1"]
+        self.assertEqual(stats["limit"], 4.25)
+        self.assertEqual(stats["rate"], 26)
+
+    def test_retry_after(self):
+        self.assertEqual(rest._retry_after("12"), 12)
+        self.assertIsNone(rest._retry_after(None))
+        self.assertIsNone(rest._retry_after("soon"))
+        self.assertLessEqual(
+            rest._retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0
+        )
+
+    def test_endpoint(self):
+        node = NodeServer(ThrottleHandler, "127.0.0.4")
+        limiter, rest.LIMITER = rest.LIMITER, rest.PeerLimiter()
+        try:
+            start = time.perf_counter()
+            resp = rest.GET.api.wallets(peer=node.peer())
+            self.assertEqual(resp["path"], "/api/wallets")
+            self.assertGreaterEqual(time.perf_counter() - start, 0.39)
+            self.assertEqual(len(node.calls), 3)
+            self.assertEqual(rest.LIMITER.stats()["127.0.0.4"]["throttled"], 2)
+        finally:
+            rest.LIMITER = limiter
+            node.stop()
+
+
+class ConditionalHandler(Handler):
+
+    def do_GET(self):
+        self.server.calls.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"data": list(range(1000))}).encode("utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ValidatorCacheTest(TestCase):
+
+    def setUp(self):
+        self.node = NodeServer(ConditionalHandler)
+        self._validators, rest.VALIDATORS = \
+            rest.VALIDATORS, rest.ValidatorCache()
+        self._metrics, rest.METRICS = rest.METRICS, rest.Metrics()
+
+    def tearDown(self):
+        rest.VALIDATORS = self._validators
+        rest.METRICS = self._metrics
+        self.node.stop()
+
+    def test_revalidation(self):
+        rest.METRICS.enable()
+        first = rest.GET.api.voters(peer=self.node.peer())
+        second = rest.GET.api.voters(peer=self.node.peer())
+        self.assertEqual(first, {"data": list(range(1000))})
+        self.assertEqual(second, first)
+        self.assertIn("gzip", self.node.calls[0]["Accept-Encoding"])
+        self.assertNotIn("If-None-Match", self.node.calls[0])
+        self.assertEqual(self.node.calls[1]["If-None-Match"], '"v1"')
+        self.assertEqual(rest.VALIDATORS.stats()["hits"], 1)
+        voters = rest.METRICS.snapshot()["paths"]["api/voters"]
+        self.assertEqual(voters["status"], {"200": 1, "304": 1})
+        # compressed bytes are counted
+        self.assertLess(voters["bytes_in"], len(json.dumps(first)))
+        # other query strings are other urls
+        rest.GET.api.voters(peer=self.node.peer(), page=2)
+        self.assertNotIn("If-None-Match", self.node.calls[2])
+        # only validators and bodies are stored
+        for stored in rest.VALIDATORS._data.values():
+            self.assertIsInstance(stored[2], bytes)
+            self.assertEqual(stored[3], 200)
+
+    def test_evicted(self):
+
+        class EvictingCache(rest.ValidatorCache):
+            # stored body is evicted right after headers are sent
+            def headers(self, url: str) -> dict:
+                result = rest.ValidatorCache.headers(self, url)
+                self.clear()
+                return result
+
+        rest.VALIDATORS = EvictingCache()
+        first = rest.GET.api.voters(peer=self.node.peer())
+        second = rest.GET.api.voters(peer=self.node.peer())
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.node.calls), 3)
+        self.assertEqual(self.node.calls[1]["If-None-Match"], '"v1"')
+        self.assertNotIn("If-None-Match", self.node.calls[2])
+
+
+class WalletHandler(Handler):
+    wallets = [
+        {
+            "address": f"D{i:033d}", "publicKey": f"02{i:064x}",
+            "attributes": {"username": f"user{i}"}
+        } for i in range(50)
+    ]
+
+    def do_GET(self):
+        time.sleep(0.05)
+        identifier = self.path.split("/")[-1]
+        self.server.calls.append(identifier)
+        if identifier == "broken":
+            # drop connection without reply
+            self.close_connection = True
+            return
+        for wallet in self.wallets:
+            if identifier in WalletResolver.identifiers(wallet):
+                return self._reply(200, {"data": wallet})
+        self._reply(404, {"statusCode": 404, "error": "Not Found"})
+
+
+class WalletResolverTest(TestCase):
+
+    def setUp(self):
+        self.node = NodeServer(WalletHandler)
+        self.peer = self.node.peer()
+        self.resolver = rest.WalletResolver()
+
+    def tearDown(self):
+        self.node.stop()
+
+    def test_resolve(self):
+        ids = [f"user{i}" for i in range(40)] * 2 + ["unknown"]
+        start = time.perf_counter()
+        wallets = self.resolver.resolve(ids, peer=self.peer)
+        # 41 distinct identifiers fetched concurrently
+        self.assertLess(time.perf_counter() - start, 41 * 0.05 / 2)
+        self.assertEqual(len(self.node.calls), 41)
+        self.assertEqual(len(wallets), 41)
+        self.assertIsNone(wallets["unknown"])
+        self.assertEqual(wallets["user7"], WalletHandler.wallets[7])
+        # wallets are now known by public key and address too
+        wallet = WalletHandler.wallets[3]
+        wallets = self.resolver.resolve(
+            [wallet["publicKey"], wallet["address"], "user3"], peer=self.peer
+        )
+        self.assertEqual(len(self.node.calls), 41)
+        self.assertTrue(all(w == wallet for w in wallets.values()))
+        self.resolver.invalidate("user3")
+        self.assertIsNone(self.resolver.get(wallet["address"]))
+
+    def test_failing_lookup(self):
+        wallets = self.resolver.resolve(
+            ["user1", "broken", "user2"], peer=self.peer
+        )
+        self.assertIsNone(wallets["broken"])
+        self.assertEqual(wallets["user2"], WalletHandler.wallets[2])
+
+    def test_invalidate_exact(self):
+        self.resolver.resolve(["user1", "user10"], peer=self.peer)
+        self.resolver.invalidate("user1")
+        self.assertIsNone(self.resolver.get("user1"))
+        self.assertEqual(
+            self.resolver.get("user10"), WalletHandler.wallets[10]
+        )
+
+    def test_unwrap(self):
+        wallet = WalletHandler.wallets[0]
+        self.assertEqual(WalletResolver.unwrap({"data": wallet}), wallet)
+        self.assertEqual(WalletResolver.unwrap(wallet), wallet)
+        self.assertIsNone(WalletResolver.unwrap({"error": "Not Found"}))
+        self.assertIsNone(WalletResolver.unwrap(requests.Response()))
+
+    def test_network_scope(self):
+        if hasattr(rest.config, "nethash"):
+            self.addCleanup(
+                setattr, rest.config, "nethash", rest.config.nethash
+            )
+        else:
+            self.addCleanup(delattr, rest.config, "nethash")
+        rest.config.nethash = "a" * 64
+        self.resolver.resolve(["user1"], peer=self.peer)
+        rest.config.nethash = "b" * 64
+        self.assertIsNone(self.resolver.get("user1"))
+        self.resolver.resolve(["user1"], peer=self.peer)
+        self.assertEqual(len(self.node.calls), 2)
+
+    def test_shared(self):
+        peers = getattr(rest.config, "peers", None)
+        resolver, rest.RESOLVER = rest.RESOLVER, self.resolver
+        rest.config.peers = [self.peer]
+        try:
+            vote = v1.Vote()
+            vote.upVote("user5")
+            self.assertEqual(
+                vote.asset["votes"], [WalletHandler.wallets[5]["publicKey"]]
+            )
+            vote.downVote(WalletHandler.wallets[5]["address"])
+            self.assertEqual(len(self.node.calls), 1)
+        finally:
+            rest.RESOLVER = resolver
+            if peers is None:
+                del rest.config.peers
+            else:
+                rest.config.peers = peers
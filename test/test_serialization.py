@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import binascii
+import tempfile
+
+from cSecp256k1 import PublicKey
+from unittest import TestCase
+from mainsail import config, identity, dumpJson, HEADER, UINT32, ADDRESSES
+from mainsail.transaction import SKIP_SIG1, SKIP_SIG2, SKIP_MSIG
+from mainsail.transaction import TransactionRecord, sign_batch, verify_batch
+from mainsail import tx as mtx
+from mainsail.tx import v1
+
+PUK = PublicKey.from_secret("secret").encode()
+
+
+def _transfer() -> v1.Transfer:
+    setattr(config, "version", 30)
+    tx = v1.Transfer(
+        1.0, identity.get_wallet(PublicKey.from_secret("s0").encode()),
+        "message"
+    )
+    # bypass REST call done by senderPublicKey setter
+    tx._senderPublicKey = PUK
+    tx.nonce = 2
+    tx.signature = "ab" * 64
+    tx.signatures = ["00" + "cd" * 64]
+    return tx
+
+
+class SerializationTest(TestCase):
+
+    def test_bytes_and_hex_match(self):
+        tx = _transfer()
+        for mask in [0, SKIP_SIG1, SKIP_SIG1 | SKIP_SIG2 | SKIP_MSIG]:
+            self.assertEqual(
+                tx.to_bytes(mask), binascii.unhexlify(tx.serialize(mask))
+            )
+        self.assertEqual(
+            tx.serialize(),
+            tx.serializeCommon() + tx.serializeAsset() +
+            tx.serializeSignatures(0)
+        )
+
+    def test_header_layout(self):
+        tx = _transfer()
+        header = HEADER.unpack_from(tx.to_bytes())
+        self.assertEqual(header[:6], (0xff, tx.version, 30, 1, 0, 2))
+        self.assertEqual(header[6], binascii.unhexlify(PUK))
+        self.assertEqual(header[7:], (tx.fee, len("message")))
+
+    def test_id_is_hash_of_bytes(self):
+        tx = _transfer()
+        self.assertEqual(tx.id, hashlib.sha256(tx.to_bytes()).hexdigest())
+
+    def test_memoization_and_invalidation(self):
+        tx = _transfer()
+        serial, txid = tx.to_bytes(), tx.id
+        self.assertIs(serial, tx.to_bytes())
+        self.assertIs(tx.serialize(), tx.serialize())
+        tx.nonce += 1
+        self.assertNotEqual(serial, tx.to_bytes())
+        self.assertNotEqual(txid, tx.id)
+        tx.fee = 0.5
+        self.assertEqual(tx.id, hashlib.sha256(tx.to_bytes()).hexdigest())
+
+    def test_in_place_asset_mutation(self):
+        setattr(config, "version", 30)
+        tx = v1.MultiPayment("message")
+        tx._senderPublicKey = PUK
+        tx.addPayment(1.0, identity.get_wallet(PUK))
+        serial = tx.to_bytes()
+        tx.asset["payments"].append(
+            {"recipientId": identity.get_wallet(PUK), "amount": 1}
+        )
+        self.assertNotEqual(serial, tx.to_bytes())
+        tx.signatures = []
+        serial = tx.to_bytes()
+        tx.signatures.append("00" + "cd" * 64)
+        self.assertNotEqual(serial, tx.to_bytes())
+        self.assertTrue(tx.serialize().endswith("00" + "cd" * 64))
+
+    def test_batched_payments(self):
+        setattr(config, "version", 30)
+        addresses = [
+            identity.get_wallet(PublicKey.from_secret(f"s{i}").encode())
+            for i in range(5)
+        ]
+        amounts = [1.0 + i for i in range(5)]
+        one_by_one, batched = v1.MultiPayment(), v1.MultiPayment()
+        for amount, address in zip(amounts, addresses):
+            one_by_one.addPayment(amount, address)
+        batched.addPayments(amounts, addresses)
+        self.assertEqual(one_by_one.asset, batched.asset)
+        self.assertEqual(one_by_one.amount, batched.amount)
+        self.assertEqual(
+            one_by_one.serializeAsset(), batched.serializeAsset()
+        )
+        self.assertRaises(
+            ValueError, batched.addPayments, amounts[:2], addresses
+        )
+        self.assertRaises(
+            identity.InvalidWalletAddress, batched.addPayments,
+            [1.0], [addresses[0][:-1] + "x"]
+        )
+        # addresses decoded by addPayments are not decoded again
+        ADDRESSES.clear()
+        tx = v1.MultiPayment()
+        tx.addPayments(amounts, addresses)
+        tx.serializeAsset()
+        self.assertEqual(ADDRESSES.stats()["misses"], 5)
+        self.assertEqual(ADDRESSES.stats()["hits"], 0)
+
+
+class DeserializationTest(TestCase):
+
+    def setUp(self):
+        setattr(config, "version", 30)
+        vote = v1.Vote()
+        vote.asset["votes"] = [PUK]
+        registration = v1.ValidatorRegistration()
+        registration.asset = {"validatorPublicKey": "a1" * 48}
+        payment = v1.MultiPayment("message")
+        for secret in ["secret001", "secret002", "secret003"]:
+            puk = PublicKey.from_secret(secret).encode()
+            payment.addPayment(1.0, identity.get_wallet(puk))
+        self.transactions = [_transfer(), registration, vote, payment]
+        for tx in self.transactions:
+            tx._senderPublicKey = PUK
+            tx.signature = "ab" * 64
+            tx.signatures = None
+
+    def test_round_trip(self):
+        for tx in self.transactions:
+            for signatures in [None, ["00" + "cd" * 64, "01" + "ef" * 64]]:
+                tx.signatures = signatures
+                result = mtx.deserialize(tx.serialize())
+                self.assertIsInstance(result, type(tx))
+                self.assertEqual(result.export(), tx.export())
+
+    def test_hex_like_vendor_field(self):
+        tx = _transfer()
+        for vendorField in ["cafe", "1234"]:
+            tx.vendorField = vendorField
+            for source in [tx.serialize(), tx.to_bytes()]:
+                result = mtx.deserialize(source)
+                self.assertEqual(result.vendorField, vendorField)
+                self.assertEqual(result.id, tx.id)
+            self.assertEqual(
+                next(mtx.iter_views([tx.serialize()])).vendorField,
+                vendorField
+            )
+
+    def test_length_prefixed_stream(self):
+        blob = b"".join(
+            UINT32.pack(len(tx.to_bytes())) + tx.to_bytes()
+            for tx in self.transactions
+        )
+        self.assertEqual(
+            [tx.id for tx in mtx.iter_deserialize(blob)],
+            [tx.id for tx in self.transactions]
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "transactions.bin")
+            with open(path, "wb") as out:
+                out.write(blob)
+            self.assertEqual(
+                [tx.id for tx in mtx.iter_deserialize(path)],
+                [tx.id for tx in self.transactions]
+            )
+
+    def test_concatenated_stream(self):
+        blob = b"".join(tx.to_bytes() for tx in self.transactions)
+        self.assertEqual(
+            [tx.id for tx in mtx.iter_deserialize(blob, prefixed=False)],
+            [tx.id for tx in self.transactions]
+        )
+
+    def test_registry_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "test.registry")
+            dumpJson([tx.serialize() for tx in self.transactions], path)
+            self.assertEqual(
+                [tx.id for tx in mtx.iter_deserialize(path)],
+                [tx.id for tx in self.transactions]
+            )
+
+    def test_records(self):
+        for tx in self.transactions:
+            tx.signatures = ["00" + "cd" * 64]
+            for record in [
+                TransactionRecord.from_transaction(tx),
+                mtx.deserialize(tx.serialize(), record=True)
+            ]:
+                self.assertFalse(hasattr(record, "__dict__"))
+                self.assertEqual(record.serialize(), tx.serialize())
+                self.assertEqual(record.export(), tx.export())
+                self.assertEqual(record.id, tx.id)
+
+    def test_views(self):
+        blob = b"".join(
+            UINT32.pack(len(tx.to_bytes())) + tx.to_bytes()
+            for tx in self.transactions
+        )
+        for prefixed, source in [
+            (True, blob),
+            (False, b"".join(tx.to_bytes() for tx in self.transactions)),
+            (True, [tx.serialize() for tx in self.transactions])
+        ]:
+            views = list(mtx.iter_views(source, prefixed))
+            for view, tx in zip(views, self.transactions):
+                for attr in [
+                    "type", "typeGroup", "nonce", "senderPublicKey", "fee",
+                    "vendorField", "version", "id", "asset", "signature"
+                ]:
+                    self.assertEqual(getattr(view, attr), getattr(tx, attr))
+                self.assertEqual(view.serialize(), tx.serialize())
+                self.assertEqual(view.export(), tx.export())
+                self.assertEqual(
+                    view.to_transaction().export(), tx.export()
+                )
+        self.assertEqual(
+            [v.nonce for v in mtx.iter_views(blob) if v.type == 6],
+            [self.transactions[-1].nonce]
+        )
+
+
+class SignBatchTest(TestCase):
+
+    def _check(self, **kw):
+        setattr(config, "version", 30)
+        keyring = identity.KeyRing.create("secret")
+        address = identity.get_wallet(PUK)
+        transactions = [v1.Transfer(1.0, address) for i in range(4)]
+        result = sign_batch(transactions, keyring, 10, **kw)
+        self.assertIs(result, transactions)
+        self.assertEqual([tx.nonce for tx in result], [10, 11, 12, 13])
+        for tx in result:
+            self.assertEqual(tx.senderPublicKey, keyring.puk().encode())
+        self.assertEqual(verify_batch(result, **kw), [True] * 4)
+        result[0].nonce = 1
+        self.assertEqual(verify_batch(result), [False] + [True] * 3)
+
+    def test_sequential(self):
+        self._check()
+
+    def test_process_pool(self):
+        self._check(processes=2, threshold=1)
+
+    def test_deterministic_bip340(self):
+        setattr(config, "version", 30)
+        keyring = identity.Schnorr("secret")
+        address = identity.get_wallet(PUK)
+        signatures = []
+        for kw in [{}, {"processes": 2, "threshold": 1}]:
+            transactions = [v1.Transfer(1.0, address) for i in range(4)]
+            sign_batch(transactions, keyring, 10, **kw)
+            signatures.append([tx.signature for tx in transactions])
+        self.assertEqual(signatures[0], signatures[1])